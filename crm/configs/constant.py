@@ -32,6 +32,8 @@ UPDATE_PERMISSION_EVENT = "update_permissions"
 DELETE_EVENT="delete_resource"
 NO_DOCUMENTS_MESSAGE = "Sorry, I don't have access to documents related to this topic. You can add a new document if you'd like me to help with that."
 OLLAMA_FALLBACK_MESSAGE = "⚠️ The LLM service is currently unavailable. Please try again later."
+# Qdrant's default optimizer indexing threshold (KB); 0 disables HNSW indexing during bulk uploads
+QDRANT_INDEXING_THRESHOLD = 20000
 # Default similarity threshold for document retrieval (0.0 to 1.0)
 DEFAULT_SIMILARITY_THRESHOLD = 0.6
 
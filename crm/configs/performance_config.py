@@ -28,6 +28,7 @@ class PerformanceConfig:
         chunk_overlap (int): Overlap between text chunks, defaults to 100
         video_conversion_workers (int): Workers for video conversion, defaults to 2
         video_batch_size (int): Batch size for video processing, defaults to 5
+        embedding_cache_size (int): In-memory LRU entries for the chunk embedding cache, defaults to 4096
     
     returns:
         PerformanceConfig: Configuration instance with performance settings
@@ -77,6 +78,9 @@ class PerformanceConfig:
     # Video processing
     video_conversion_workers: int = 2
     video_batch_size: int = 5
+
+    # Chunk embedding cache (0 disables it)
+    embedding_cache_size: int = 4096
     
     @classmethod
     def from_env(cls) -> 'PerformanceConfig':
@@ -123,6 +127,7 @@ class PerformanceConfig:
             
             video_conversion_workers=int(os.getenv('VIDEO_CONVERSION_WORKERS', 2)),
             video_batch_size=int(os.getenv('VIDEO_BATCH_SIZE', 5)),
+            embedding_cache_size=int(os.getenv('EMBEDDING_CACHE_SIZE', 4096)),
         )
     
     def to_dict(self) -> Dict[str, Any]:
@@ -161,6 +166,7 @@ class PerformanceConfig:
             'local_token_overlap': self.local_token_overlap,
             'video_conversion_workers': self.video_conversion_workers,
             'video_batch_size': self.video_batch_size,
+            'embedding_cache_size': self.embedding_cache_size,
         }
 
 # Global configuration instance
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from crm.configs.redis_config import redis_service
@@ -18,6 +20,12 @@ async def lifespan(crm: FastAPI):
         AsyncGenerator: Context manager that initializes services on startup and cleans up on shutdown
     """
     logger.info("Starting up the application...")
+    settings = get_settings()
+
+    # Shared pool for asyncio.to_thread / run_in_executor(None, ...) offloads
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.THREAD_POOL_SIZE, thread_name_prefix="crm-worker")
+    )
 
     # Start ollama
     load_llm()
@@ -32,7 +40,6 @@ async def lifespan(crm: FastAPI):
         logger.error(f"Redis connection failed during startup but continuing: {e}")
 
     # Start RabbitMQ consumers only if enabled to avoid importing optional stacks
-    settings = get_settings()
     if settings.ENABLE_RABBITMQ_CONSUMERS:
         try:
             from crm.rabbitmq.consumers import rabbitmq_consumer
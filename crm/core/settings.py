@@ -55,6 +55,10 @@ class Settings(BaseSettings):
     MONGODB_DB_NAME: str = Field(default="chat_db", description="MongoDB database name")
     MONGODB_USERNAME: str = Field(default="", description="MongoDB username")
     MONGODB_PASSWORD: str = Field(default="", description="MongoDB password")
+    MONGODB_MAX_POOL_SIZE: int = Field(default=100, description="Maximum MongoDB connections in the client pool")
+    MONGODB_MIN_POOL_SIZE: int = Field(default=4, description="Connections kept open in the MongoDB client pool")
+    MONGODB_MAX_IDLE_TIME_MS: int = Field(default=60000, description="Close pooled MongoDB connections idle for longer than this")
+    MONGODB_COMPRESSORS: str = Field(default="zstd,snappy,zlib", description="Preferred MongoDB wire compressors, first available wins")
 
     @property
     def mongodb_uri(self) -> str:
@@ -65,6 +69,9 @@ class Settings(BaseSettings):
     # -- Qdrant and Redis configurations
     QDRANT_HOST: str = Field(default="localhost", description="Qdrant host")
     QDRANT_PORT: int = Field(default=6333, alias="QDRANT_PORT_NUMBER", description="Qdrant port")
+    QDRANT_GRPC_PORT: int = Field(default=6334, alias="QDRANT_GRPC_PORT_NUMBER", description="Qdrant gRPC port")
+    QDRANT_PREFER_GRPC: bool = Field(default=True, description="Use gRPC instead of REST for Qdrant requests")
+    QDRANT_GRPC_GZIP: bool = Field(default=False, description="Gzip-compress Qdrant gRPC messages (helps on slow links, costs CPU)")
     QDRANT_SKIP_COLLECTION_INIT: bool = Field(default=False, description="Skip auto-creation/ensure of Qdrant collection")
 
     @property
@@ -87,11 +94,13 @@ class Settings(BaseSettings):
     RABBITMQ_USER: str = Field(default="guest", description="RabbitMQ user")
     RABBITMQ_PASSWORD: str = Field(default="guest", description="RabbitMQ password")
     ENABLE_RABBITMQ_CONSUMERS: bool = Field(default=True, description="Start RabbitMQ consumers on startup")
+    RABBITMQ_GZIP_TASKS: bool = Field(default=False, description="Gzip create_embedding message bodies (consumers must honour content_encoding)")
 
     # -- Service configurations
     LLM_PROVIDER: LLMProvider = Field(default="openai", description="LLM provider for the application")
     EMBEDDING_PROVIDER: EmbeddingProvider = Field(default="openai", description="Embedding provider for the application")
     VIDEO_TRANSCRIPTION_PROVIDER: TranscriptionProvider = Field(default="openai", description="Video transcription provider for the application")
+    THREAD_POOL_SIZE: int = Field(default=32, description="Worker threads in the event loop's default executor (blocking embed/IO calls)")
 
     # -- OpenAI configurations
     OPENAI_API_KEY: str = Field(default="", description="OpenAI API key")
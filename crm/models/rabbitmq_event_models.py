@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, AliasChoices, field_validator
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 
 class ResourceEvent(BaseModel):
@@ -172,3 +172,13 @@ class EmbeddingResponse(BaseModel):
                     normalized[key] = {"text": chunk}
             return normalized
         raise TypeError("chunks must be a dictionary or list-compatible payload")
+
+    def ordered_chunk_items(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Return (chunk_key, payload) pairs with numeric keys in index order first,
+        then any non-numeric keys alphabetically; mixed keys never compare int to str.
+        """
+        return sorted(
+            self.chunks.items(),
+            key=lambda item: (0, int(item[0]), "") if item[0].isdecimal() else (1, 0, item[0]),
+        )
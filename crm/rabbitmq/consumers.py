@@ -1,4 +1,5 @@
 import pika
+import gzip
 import json
 import threading
 import logging
@@ -61,6 +62,8 @@ class RabbitMQConsumer:
             None: Processes message and sends acknowledgment or negative acknowledgment
         """
         try:
+            if getattr(properties, "content_encoding", None) == "gzip":
+                body = gzip.decompress(body)
             message = json.loads(body)
             logger.info(f"[RabbitMQ] Received message from '{queue_name}': {json.dumps(message, indent=2)}")
 
@@ -1,3 +1,4 @@
+import gzip
 import json
 import pika
 from .rabbitmq import RabbitMQConnection
@@ -51,6 +52,24 @@ class RabbitMQProducer:
                 return None
         return self.channel
 
+    def _encode(self, message, compress=False):
+        """
+        Description: Serialize a message to a JSON body, gzipped when requested, with matching properties
+        
+        args:
+            message: Message object to serialize
+            compress (bool): Gzip the body and mark it with content_encoding="gzip", defaults to False
+        
+        returns:
+            tuple: (body bytes, pika.BasicProperties) ready for basic_publish
+        """
+        body = json.dumps(message).encode("utf-8")
+        if not compress:
+            return body, pika.BasicProperties(delivery_mode=2)
+        return gzip.compress(body, compresslevel=6), pika.BasicProperties(
+            delivery_mode=2, content_type="application/json", content_encoding="gzip"
+        )
+
     def _summarize_message(self, message):
         if not isinstance(message, dict):
             return message
@@ -73,13 +92,15 @@ class RabbitMQProducer:
                     summary["embeddings_preview"] = first_embedding
         return summary
 
-    def publish_message(self, message, routing_key):
+    def publish_message(self, message, routing_key, compress=False):
         """
-        Description: Publish JSON message to exchange with routing key and automatic reconnection on failure
+        Description: Publish JSON message to exchange with routing key and automatic reconnection on failure;
+        no publisher confirms are requested, so the call does not wait on a broker round-trip
         
         args:
             message: Message object to serialize and publish
             routing_key (str): Routing key for message delivery
+            compress (bool): Gzip the JSON body, defaults to False
         
         returns:
             None: Publishes message with durable delivery, handles reconnection on errors
@@ -89,11 +110,12 @@ class RabbitMQProducer:
             logger.info(f"Cannot publish to exchange {self.exchange_name}: channel unavailable")
             return
         try:
+            body, properties = self._encode(message, compress)
             channel.basic_publish(
                 exchange=self.exchange_name,
                 routing_key=routing_key,
-                body=json.dumps(message),
-                properties=pika.BasicProperties(delivery_mode=2),
+                body=body,
+                properties=properties,
             )
             summary = self._summarize_message(message)
             logger.info(
@@ -108,6 +130,47 @@ class RabbitMQProducer:
             self.connection_manager.close()
             self.connection_manager.initialize()
 
+    def publish_messages(self, messages, routing_key, compress=False):
+        """
+        Description: Publish several JSON messages over one channel instead of one connection per message;
+        the channel is not in confirm mode, so this returns once the frames are written, without a broker ack
+        
+        args:
+            messages (list): Message objects to serialize and publish, in order
+            routing_key (str): Routing key for message delivery
+            compress (bool): Gzip each JSON body, defaults to False
+        
+        returns:
+            int: Number of messages published before the first failure
+        """
+        channel = self.get_channel()
+        if channel is None:
+            logger.info(f"Cannot publish to exchange {self.exchange_name}: channel unavailable")
+            return 0
+        published = 0
+        try:
+            for message in messages:
+                body, properties = self._encode(message, compress)
+                channel.basic_publish(
+                    exchange=self.exchange_name,
+                    routing_key=routing_key,
+                    body=body,
+                    properties=properties,
+                )
+                published += 1
+                logger.info(
+                    "Published message to exchange %s with routing key %s: %s",
+                    self.exchange_name,
+                    routing_key,
+                    self._summarize_message(message),
+                )
+        except Exception as e:
+            logger.error(f"Failed to send message {published + 1}/{len(messages)} to {self.exchange_name}: {e}")
+            self.channel = None
+            self.connection_manager.close()
+            self.connection_manager.initialize()
+        return published
+
     def close(self):
         """
         Description: Close producer channel and connection manager with graceful error handling
@@ -127,7 +190,7 @@ class RabbitMQProducer:
         self.channel = None
         self.connection_manager.close()
 
-def rabbitmq_producer(message, exchange_name, routing_key, queue_name=None):
+def rabbitmq_producer(message, exchange_name, routing_key, queue_name=None, compress=False):
     """
     Description: Utility function to create producer and publish single message with automatic cleanup
     
@@ -136,6 +199,7 @@ def rabbitmq_producer(message, exchange_name, routing_key, queue_name=None):
         exchange_name (str): Name of the RabbitMQ exchange
         routing_key (str): Routing key for message delivery
         queue_name (str): Optional queue name parameter (not currently used)
+        compress (bool): Gzip the JSON body, defaults to False
     
     returns:
         None: Creates producer instance and publishes message
@@ -145,5 +209,28 @@ def rabbitmq_producer(message, exchange_name, routing_key, queue_name=None):
     logger.info(
         f"Producing RabbitMQ event '{event_name or 'unknown'}' -> exchange {exchange_name}, routing {routing_key}"
     )
-    producer.publish_message(message, routing_key)
+    producer.publish_message(message, routing_key, compress=compress)
 
+
+
+def rabbitmq_producer_many(messages, exchange_name, routing_key, compress=False):
+    """
+    Description: Publish several messages through a single producer connection, then close it
+    
+    args:
+        messages (list): Message objects to publish, in order
+        exchange_name (str): Name of the RabbitMQ exchange
+        routing_key (str): Routing key for message delivery
+        compress (bool): Gzip each JSON body, defaults to False
+    
+    returns:
+        int: Number of messages published
+    """
+    producer = RabbitMQProducer(exchange_name)
+    logger.info(
+        f"Producing {len(messages)} RabbitMQ events -> exchange {exchange_name}, routing {routing_key}"
+    )
+    try:
+        return producer.publish_messages(messages, routing_key, compress=compress)
+    finally:
+        producer.close()
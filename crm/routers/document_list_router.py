@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Query
 from qdrant_client.models import Filter, FieldCondition, MatchValue
-from crm.utils.qdrand_db import client
+from crm.utils.qdrand_db import get_client
 # from crm.configs.collection_name_configs import COLLECTION_NAME
 from crm.core.settings import get_settings
 
@@ -27,7 +27,7 @@ async def list_documents(
         must=[FieldCondition(key="organization_id", match=MatchValue(value=organization_id))]
     )
 
-    result, _ = client.scroll(
+    result, _ = get_client().scroll(
         collection_name=collection_name,
         scroll_filter=scroll_filter,
         limit=limit,
@@ -47,3 +47,23 @@ async def list_documents(
     } for point in result]
 
     return {"documents": documents}
+
+
+@router.get("/documents/status")
+async def document_status(
+    resource_id: str = Query(..., description="Resource ID returned by the upload endpoint")
+):
+    """
+    Description: Report how many chunks of an uploaded resource are already stored in Qdrant
+    
+    args:
+        resource_id (str): Resource identifier assigned when the document was queued for embedding
+    
+    returns:
+        dict: Object with the resource_id and its indexed_chunks count
+    """
+    count_filter = Filter(
+        must=[FieldCondition(key="resource_id", match=MatchValue(value=resource_id))]
+    )
+    result = get_client().count(collection_name=collection_name, count_filter=count_filter, exact=True)
+    return {"resource_id": resource_id, "indexed_chunks": result.count}
@@ -3,7 +3,7 @@ from fastapi.responses import JSONResponse
 import tempfile
 import os
 from crm.services.qdrant_services import PDFEmbedder
-from crm.utils.qdrand_db import client, ensure_collection_exists
+from crm.utils.qdrand_db import get_client, ensure_collection_exists
 from crm.utils.embedder import embedder
 from crm.core.settings import get_settings
 from crm.utils.logger import logger
@@ -63,7 +63,7 @@ async def upload_pdf(file: UploadFile = File(...)):
     try:
         service = PDFEmbedder(
             collection_name=settings.COLLECTION_NAME,
-            client=client,
+            client=get_client(),
             embedder=embedder,
         )
 
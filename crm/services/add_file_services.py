@@ -4,7 +4,7 @@ from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from typing import Dict, List, Optional
 from crm.services.downlaod_store_services import MetadataProcessor
 from crm.services.qdrant_services import PDFEmbedder
-from crm.utils.qdrand_db import client
+from crm.utils.qdrand_db import get_client
 from crm.utils.embedder import embedder
 # from crm.configs.collection_name_configs import COLLECTION_NAME
 from crm.core.settings import get_settings
@@ -50,7 +50,7 @@ class AddFileServices:
         logger.info(f"Collection Name for the storage : {COLLECTION_NAME}")
         self.embedder = PDFEmbedder(
             collection_name=COLLECTION_NAME,
-            client=client,
+            client=get_client(),
             embedder=embedder
         )
         # Transcription disabled: no dependency on VideoTranscriber
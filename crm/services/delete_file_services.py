@@ -1,7 +1,7 @@
 from typing import Optional, List
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
-from crm.utils.qdrand_db import client
+from crm.utils.qdrand_db import get_client
 # from crm.configs.collection_name_configs import COLLECTION_NAME
 from crm.core.settings import get_settings
 from crm.models.rabbitmq_event_models import ResourceEvent
@@ -33,7 +33,7 @@ class DeleteFileServices:
             None
         """
         self.collection_name = collection_name
-        self.client = client
+        self.client = get_client()
         self.chat_cache = ChatCache()
 
     def delete_embeddings(self, file_info: ResourceEvent) -> None:
@@ -7,6 +7,7 @@ from crm.utils.logger import logger
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 rag_dir = os.path.join(BASE_DIR,"..","..","rag_documents")
+_UNSAFE_FILENAME_CHARS = re.compile(r'[<>:"/\\|?*]')
 
 
 class MetadataProcessor:
@@ -61,7 +62,7 @@ class MetadataProcessor:
         # Use original filename if available, otherwise fallback to resource_id
         if original_filename:
             # Clean the filename to remove any invalid characters
-            clean_filename = re.sub(r'[<>:"/\\|?*]', '_', original_filename)
+            clean_filename = _UNSAFE_FILENAME_CHARS.sub('_', original_filename)
             # Ensure the filename has the correct extension
             if not clean_filename.lower().endswith(ext.lower()):
                 clean_filename = clean_filename + ext
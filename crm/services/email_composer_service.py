@@ -1,12 +1,12 @@
 import json
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 from dataclasses import dataclass
 
 # No direct chat role messages needed; prompts live in templates
 
 from crm.services.llm_service import llm
 from crm.utils.embedder import embedder
-from crm.utils.qdrand_db import client
+from crm.utils.qdrand_db import get_client
 from crm.models.email_models import (
     ComposeEmailRequest,
     ComposeEmailResponse,
@@ -21,7 +21,7 @@ from crm.prompts.email_prompts import (
     EMAIL_LOST_TEMPLATE,
 )
 from crm.utils.logger import logger
-from crm.core.settings import get_settings
+from crm.core.settings import Settings, get_settings
 
 
 @dataclass
@@ -35,13 +35,17 @@ class EmailComposerService:
     Compose status-aware emails with clear separation of system prompt, user query, and retrieved context.
     """
 
-    def __init__(self):
+    def __init__(self, settings: Optional[Settings] = None):
         self.llm = llm
         self.embedder = embedder
-        self.client = client
-        self.settings = get_settings()
+        self.settings = settings or get_settings()
         self.collection_name = self.settings.COLLECTION_NAME
 
+    @property
+    def client(self):
+        # Resolved on use: the router builds this service at import, before Qdrant is needed
+        return get_client()
+
     # ------------------------- LLM helpers -------------------------
     # Prompts are defined in crm/prompts; invoke returns string content
     def _invoke_text(self, prompt: str) -> str:
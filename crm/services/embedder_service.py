@@ -11,24 +11,24 @@ an `embedding_response` event that this app will store in Qdrant via
 EventProcessor.store_received_embeddings.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import uuid
 
 from crm.utils.logger import logger
-from crm.core.settings import get_settings
+from crm.core.settings import Settings, get_settings
 from crm.configs.constant import EXCHANGE_NAME, EMBEDDING_TASK_QUEUE
-from crm.rabbitmq.producers import rabbitmq_producer
+from crm.rabbitmq.producers import rabbitmq_producer, rabbitmq_producer_many
 
 # Reuse existing document loaders
 from crm.services.qdrant_services import PDFEmbedder
-from crm.utils.qdrand_db import client as qdrant_client
+from crm.utils.qdrand_db import get_client
 from crm.utils.embedder import embedder as local_embedder  # only to satisfy PDFEmbedder init
 
 
 class EmbeddingTaskService:
-    def __init__(self, exchange_name: str = EXCHANGE_NAME) -> None:
+    def __init__(self, exchange_name: str = EXCHANGE_NAME, settings: Optional[Settings] = None) -> None:
         self.exchange_name = exchange_name
-        self.settings = get_settings()
+        self.settings = settings or get_settings()
 
     def queue_texts(
         self,
@@ -42,6 +42,62 @@ class EmbeddingTaskService:
         routing_key: str = EMBEDDING_TASK_QUEUE,
     ) -> Dict[str, Any]:
         """Publish a `create_embedding` task for the given text chunks."""
+        message, result = self._build_task(
+            texts,
+            resource_id=resource_id,
+            file_name=file_name,
+            file_path=file_path,
+            user_id=user_id,
+            organization_id=organization_id,
+        )
+        rabbitmq_producer(
+            message, self.exchange_name, routing_key=routing_key, compress=self.settings.RABBITMQ_GZIP_TASKS
+        )
+        logger.info(
+            f"Queued embedding task: task_id={result['task_id']} resource_id={result['resource_id']} "
+            f"chunks={len(texts)} routing_key={routing_key}"
+        )
+        return result
+
+    def queue_files(
+        self,
+        file_texts: List[Tuple[str, List[str]]],
+        *,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        routing_key: str = EMBEDDING_TASK_QUEUE,
+    ) -> List[Dict[str, Any]]:
+        """Publish one `create_embedding` task per (file_path, texts) pair over a single connection."""
+        tasks = [
+            self._build_task(
+                texts,
+                file_name=path,
+                file_path=path,
+                user_id=user_id,
+                organization_id=organization_id,
+            )
+            for path, texts in file_texts
+        ]
+        if not tasks:
+            return []
+        published = rabbitmq_producer_many(
+            [m for m, _ in tasks], self.exchange_name, routing_key=routing_key,
+            compress=self.settings.RABBITMQ_GZIP_TASKS,
+        )
+        logger.info(f"Queued {published}/{len(tasks)} embedding tasks routing_key={routing_key}")
+        return [result for _, result in tasks[:published]]
+
+    def _build_task(
+        self,
+        texts: List[str],
+        *,
+        resource_id: Optional[str] = None,
+        file_name: Optional[str] = None,
+        file_path: Optional[str] = None,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Build the `create_embedding` message and the caller-facing acknowledgement for it."""
         if not texts:
             raise ValueError("No texts provided to queue for embedding")
 
@@ -64,12 +120,7 @@ class EmbeddingTaskService:
         if organization_id:
             message["organization_id"] = organization_id
 
-        rabbitmq_producer(message, self.exchange_name, routing_key=routing_key)
-        logger.info(
-            f"Queued embedding task: task_id={task_id} resource_id={rid} chunks={len(texts)} routing_key={routing_key}"
-        )
-
-        return {
+        return message, {
             "status": "accepted",
             "task_id": task_id,
             "resource_id": rid,
@@ -93,7 +144,7 @@ class EmbeddingTaskService:
         """
         loader = PDFEmbedder(
             collection_name=self.settings.COLLECTION_NAME,
-            client=qdrant_client,
+            client=get_client(),
             embedder=local_embedder,
         )
 
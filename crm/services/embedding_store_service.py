@@ -8,7 +8,8 @@ Intended for event-driven workflows where an external worker produces embeddings
 and this service persists them.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+import asyncio
 import uuid
 import time
 
@@ -16,7 +17,7 @@ from qdrant_client.models import PointStruct
 
 from crm.utils.logger import logger
 from crm.core.settings import get_settings
-from crm.utils.qdrand_db import client as qdrant_client, ensure_collection_exists
+from crm.utils.qdrand_db import get_client, create_async_client, ensure_collection_exists
 
 
 class QdrantEmbeddingStore:
@@ -28,7 +29,7 @@ class QdrantEmbeddingStore:
         settings = get_settings()
         self.collection = collection_name or settings.COLLECTION_NAME
         self.embedding_dim = embedding_dim or settings.EMBEDDING_DIM
-        self.client = qdrant_client
+        self.client = get_client()
 
     def ensure_collection(self) -> None:
         """Ensure target collection exists with correct vector size and cosine distance."""
@@ -52,12 +53,110 @@ class QdrantEmbeddingStore:
 
         Returns number of points upserted.
         """
+        points = self._build_points(
+            embeddings, chunks, resource_id=resource_id, file_name=file_name,
+            file_path=file_path, metadata=metadata,
+        )
+        if not points:
+            return 0
+
+        upsert_start = time.perf_counter()
+        self.client.upsert(collection_name=self.collection, points=points)
+        upsert_duration = time.perf_counter() - upsert_start
+        logger.info(
+            "Embeddings stored in Qdrant",
+            extra={
+                "collection": self.collection,
+                "points": len(points),
+                "resource_id": points[0].payload["resource_id"],
+                "duration_sec": round(upsert_duration, 3),
+            },
+        )
+        return len(points)
+
+    async def astore_batches(
+        self,
+        batches: AsyncIterator[Tuple[List[str], List[List[float]]]],
+        *,
+        total_chunks: int,
+        concurrency: int = 2,
+        resource_id: Optional[str] = None,
+        file_name: Optional[str] = None,
+        file_path: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        Upsert (chunks, embeddings) batches as they are produced, so producing the
+        next batch overlaps with the in-flight upserts of earlier ones. At most
+        `concurrency` upserts are pending; beyond that the producer waits.
+
+        Returns number of points upserted.
+        """
+        if total_chunks <= 0:
+            logger.warning("No chunks provided to astore_batches()")
+            return 0
+
+        self.ensure_collection()
+        rid = resource_id or uuid.uuid4().hex
+        gate = asyncio.Semaphore(max(1, concurrency))
+        client = create_async_client()
+        tasks: List[asyncio.Task] = []
+
+        async def upsert(batch: List[PointStruct]) -> None:
+            try:
+                await client.upsert(collection_name=self.collection, points=batch, wait=False)
+            finally:
+                gate.release()
+
+        stored = 0
+        offset = 0
+        upsert_start = time.perf_counter()
+        try:
+            async for chunks, embeddings in batches:
+                points = self._make_points(
+                    embeddings, chunks, rid, offset=offset, total=total_chunks,
+                    file_name=file_name, file_path=file_path, metadata=metadata,
+                )
+                offset += len(chunks)
+                if not points:
+                    continue
+                await gate.acquire()
+                tasks.append(asyncio.create_task(upsert(points)))
+                stored += len(points)
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await client.close()
+        logger.info(
+            "Embeddings stored in Qdrant",
+            extra={
+                "collection": self.collection,
+                "points": stored,
+                "concurrency": concurrency,
+                "resource_id": rid,
+                "duration_sec": round(time.perf_counter() - upsert_start, 3),
+            },
+        )
+        return stored
+
+    def _build_points(
+        self,
+        embeddings: List[List[float]],
+        chunks: List[str],
+        *,
+        resource_id: Optional[str] = None,
+        file_name: Optional[str] = None,
+        file_path: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[PointStruct]:
+        """Validate inputs, ensure the collection and build one PointStruct per valid vector."""
         if not embeddings:
             logger.warning("No embeddings provided to store()")
-            return 0
+            return []
         if not chunks:
             logger.warning("No chunks provided to store()")
-            return 0
+            return []
 
         logger.info(
             "Preparing to store embeddings",
@@ -71,14 +170,38 @@ class QdrantEmbeddingStore:
 
         self.ensure_collection()
 
-        rid = resource_id or uuid.uuid4().hex
+        total = min(len(embeddings), len(chunks))
+        points = self._make_points(
+            embeddings, chunks, resource_id or uuid.uuid4().hex, total=total,
+            file_name=file_name, file_path=file_path, metadata=metadata,
+        )
+        if not points:
+            logger.warning("No valid points to upsert")
+        return points
+
+    def _make_points(
+        self,
+        embeddings: List[List[float]],
+        chunks: List[str],
+        rid: str,
+        *,
+        offset: int = 0,
+        total: int,
+        file_name: Optional[str] = None,
+        file_path: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[PointStruct]:
+        """Build PointStructs for one run of chunks starting at chunk index `offset` of `total`."""
         ts = int(time.time())
         points: List[PointStruct] = []
 
-        total = min(len(embeddings), len(chunks))
-        for i in range(total):
-            vec = embeddings[i]
-            txt = chunks[i]
+        for j in range(min(len(embeddings), len(chunks))):
+            i = offset + j
+            vec = embeddings[j]
+            if hasattr(vec, "tolist"):
+                # Local sentence-transformers models return numpy rows
+                vec = vec.tolist()
+            txt = chunks[j]
             if not isinstance(vec, list) or not vec:
                 logger.debug(f"Skipping invalid vector at index {i}")
                 continue
@@ -106,21 +229,4 @@ class QdrantEmbeddingStore:
                     payload=payload,
                 )
             )
-
-        if not points:
-            logger.warning("No valid points to upsert")
-            return 0
-
-        upsert_start = time.perf_counter()
-        self.client.upsert(collection_name=self.collection, points=points)
-        upsert_duration = time.perf_counter() - upsert_start
-        logger.info(
-            "Embeddings stored in Qdrant",
-            extra={
-                "collection": self.collection,
-                "points": len(points),
-                "resource_id": rid,
-                "duration_sec": round(upsert_duration, 3),
-            },
-        )
-        return len(points)
+        return points
@@ -197,8 +197,7 @@ class EventProcessor:
                     },
                 )
                 return False
-            chunk_items = list(embedding_response.chunks.items())
-            chunk_items.sort(key=lambda item: int(item[0]) if str(item[0]).isdigit() else item[0])
+            chunk_items = embedding_response.ordered_chunk_items()
             chunk_payloads = [item[1] for item in chunk_items]
 
             if not embedding_response.embeddings or not chunk_payloads:
@@ -249,8 +248,7 @@ class EventProcessor:
         try:
             store = QdrantEmbeddingStore()
             embeddings = embedding_response.embeddings or []
-            chunk_items = list(embedding_response.chunks.items())
-            chunk_items.sort(key=lambda item: int(item[0]) if str(item[0]).isdigit() else item[0])
+            chunk_items = embedding_response.ordered_chunk_items()
             chunk_payloads = [item[1] for item in chunk_items]
             resource_id = embedding_response.resource_id
             chunk_texts: List[str] = []
@@ -16,7 +16,7 @@ from crm.core.settings import get_settings
 from crm.services.embedder_service import EmbeddingTaskService
 from crm.services.delete_file_services import DeleteFileServices
 from crm.services.qdrant_services import PDFEmbedder
-from crm.utils.qdrand_db import client as qdrant_client
+from crm.utils.qdrand_db import get_client
 from crm.utils.embedder import embedder as local_embedder
 from crm.models.rabbitmq_event_models import ResourceEvent
 
@@ -40,7 +40,7 @@ class PipelineService:
     def _extract_texts(self, file_path: str, file_type: str):
         loader = PDFEmbedder(
             collection_name=self.settings.COLLECTION_NAME,
-            client=qdrant_client,
+            client=get_client(),
             embedder=local_embedder,
         )
         if file_type == "pdf":
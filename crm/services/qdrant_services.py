@@ -1,20 +1,28 @@
 import os
+import asyncio
+import re
 import uuid
 import time
 from typing import Optional, Dict, List
-from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader, UnstructuredHTMLLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from qdrant_client.models import PointStruct, Filter, FieldCondition, MatchAny
-from crm.utils.qdrand_db import client
-from crm.utils.embedder import embedder
+import numpy as np
+from qdrant_client.models import Batch, Filter, FieldCondition, MatchAny, OptimizersConfigDiff
+from crm.utils.qdrand_db import get_client
+from crm.utils.embedder import embedder as default_embedder
+from crm.utils.embedding_cache import EmbeddingCache
+from crm.core.settings import get_settings
 from crm.utils.token_text_splitter import TikTokenTextSplitter
 from crm.utils.table_aware_splitter import TableAwareTextSplitter
+from crm.utils.document_loader import load_documents
 from crm.models.rabbitmq_event_models import ResourceEvent
-from crm.configs.constant import EXCHANGE_NAME
+from crm.configs.constant import EXCHANGE_NAME, QDRANT_INDEXING_THRESHOLD
 from crm.rabbitmq.producers import rabbitmq_producer
 from crm.utils.logger import logger
 from crm.configs.performance_config import perf_config
-# Note: Heavy OpenAI vision extraction is optional; import lazily where needed
+# Note: Heavy OpenAI vision extraction and the LangChain document loaders are imported lazily where needed
+
+# Pattern to match transcript timestamps like [12.3s-45.6s]
+_RE_TS_RANGE = re.compile(r'\[(\d+\.?\d*)s-(\d+\.?\d*)s\]')
 
 class PDFEmbedder:
     """
@@ -31,14 +39,14 @@ class PDFEmbedder:
         PDFEmbedder: Instance for handling document processing and embedding operations
     """
 
-    def __init__(self, collection_name, client, embedder, chunk_size=500, chunk_overlap=100):
+    def __init__(self, collection_name, client=None, embedder=None, chunk_size=500, chunk_overlap=100):
         """
         Description: Initialize the PDFEmbedder with collection configuration, vector DB client, and text splitting parameters
         
         args:
             collection_name (str): The name of the Qdrant collection to insert into
-            client: The Qdrant client instance for upserting points
-            embedder: The embedding model used to encode document chunks
+            client: The Qdrant client instance for upserting points, defaults to the shared get_client()
+            embedder: The embedding model used to encode document chunks, defaults to the shared embedder
             chunk_size (int): Maximum characters in each text chunk
             chunk_overlap (int): Number of characters to overlap between chunks
         
@@ -46,8 +54,8 @@ class PDFEmbedder:
             None
         """
         self.collection_name = collection_name
-        self.client = client
-        self.embedder = embedder
+        self.client = client or get_client()
+        self.embedder = embedder or default_embedder
         
         # Initialize both character-based and token-based splitters
         self.char_splitter = RecursiveCharacterTextSplitter(
@@ -69,17 +77,24 @@ class PDFEmbedder:
         
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.global_id_counter = 0
+
+        # Content-hash cache so identical chunks are only embedded once per model
+        self.embedding_cache = None
+        if perf_config.embedding_cache_size > 0:
+            model_id = f"{getattr(self.embedder, 'model_name', 'unknown')}:{get_settings().EMBEDDING_DIM}"
+            self.embedding_cache = EmbeddingCache(model_id, max_memory_items=perf_config.embedding_cache_size)
         logger.info(f"Collection Helper on Qdrant Services: {self.collection_name}")
         logger.info(f"Using table-aware chunking: {perf_config.max_tokens_per_chunk} tokens, {perf_config.token_overlap} overlap")
 
-    def document_splitter(self, documents, use_token_splitting=True):
+    def document_splitter(self, documents, use_token_splitting=True, return_documents=True):
         """
         Description: Split documents into smaller text chunks using token-based or character-based splitting
         
         args:
             documents: List of documents loaded by a LangChain loader
             use_token_splitting (bool): Whether to use token-based splitting (recommended)
+            return_documents (bool): Return Document objects; when False return (text, metadata) tuples
+                that share the source page's metadata dict instead of building a Document per chunk
         
         returns:
             List: List of text chunks ready for embedding
@@ -91,6 +106,10 @@ class PDFEmbedder:
             all_chunks = []
             for doc in documents:
                 text_chunks = self.token_splitter.split_text(doc.page_content)
+                if not return_documents:
+                    metadata = doc.metadata
+                    all_chunks.extend((chunk_text, metadata) for chunk_text in text_chunks)
+                    continue
                 # Create mock document objects with same structure as LangChain
                 for chunk_text in text_chunks:
                     chunk_doc = type(doc)(
@@ -103,35 +122,135 @@ class PDFEmbedder:
             return all_chunks
         else:
             # Fallback to character-based splitting
-            return self.char_splitter.split_documents(documents)
+            chunk_docs = self.char_splitter.split_documents(documents)
+            if not return_documents:
+                return [(doc.page_content, doc.metadata) for doc in chunk_docs]
+            return chunk_docs
 
-    def load_and_split_pdf(self, pdf_path):
+    def load_and_split_pdf(self, pdf_path, return_documents=True):
         """
         Description: Load and split a PDF file into chunks using PyPDFLoader
         
         args:
             pdf_path (str): Path to the PDF file to process
+            return_documents (bool): Return Document objects instead of (text, metadata) tuples
         
         returns:
             List: List of text chunks from the PDF document
         """
-        loader = PyPDFLoader(pdf_path)
-        documents = loader.load()
-        return self.document_splitter(documents)
+        documents = load_documents(pdf_path, "pdf")
+        return self.document_splitter(documents, return_documents=return_documents)
 
-    def load_and_split_html(self, html_path):
+    def load_and_split_html(self, html_path, return_documents=True):
         """
         Description: Load and split an HTML file into chunks using UnstructuredHTMLLoader
         
         args:
             html_path (str): Path to the HTML file to process
+            return_documents (bool): Return Document objects instead of (text, metadata) tuples
         
         returns:
             List: List of text chunks from the HTML document
         """
-        loader = UnstructuredHTMLLoader(html_path)
-        documents = loader.load()
-        return self.document_splitter(documents)
+        documents = load_documents(html_path, "html")
+        return self.document_splitter(documents, return_documents=return_documents)
+
+    def load_and_split_docx(self, docx_path, return_documents=True):
+        """
+        Description: Load and split a DOCX file into chunks using Docx2txtLoader
+        
+        args:
+            docx_path (str): Path to the DOCX file to process
+            return_documents (bool): Return Document objects instead of (text, metadata) tuples
+        
+        returns:
+            List: List of text chunks from the DOCX document
+        """
+        documents = load_documents(docx_path, "docx")
+        return self.document_splitter(documents, return_documents=return_documents)
+
+    async def _encode_with_cache(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts, reusing cached vectors for chunks that were embedded before.
+
+        Args:
+            texts (List[str]): Chunk texts to embed.
+
+        Returns:
+            List[List[float]]: Embeddings in the same order as texts.
+        """
+        if self.embedding_cache is None:
+            return await self.embedder.encode(texts)
+
+        keys = [self.embedding_cache.key(t) for t in texts]
+        # The cache is sqlite-backed; keep its reads and writes off the event loop
+        hits = await asyncio.to_thread(self.embedding_cache.get_many, keys)
+        miss_idx = [i for i, k in enumerate(keys) if k not in hits]
+        logger.info(f"Embedding cache: {len(texts) - len(miss_idx)} hits, {len(miss_idx)} misses")
+
+        if miss_idx:
+            new_embeds = await self.embedder.encode([texts[i] for i in miss_idx])
+            if len(new_embeds) != len(miss_idx):
+                raise ValueError(
+                    f"Embedder returned {len(new_embeds)} vectors for {len(miss_idx)} chunks"
+                )
+            miss_items = [(keys[i], emb) for i, emb in zip(miss_idx, new_embeds)]
+            await asyncio.to_thread(self.embedding_cache.set_many, miss_items)
+            hits.update(miss_items)
+
+        return [hits[k] for k in keys]
+
+    def _extract_texts(self, file_path: str, file_type: Optional[str]) -> List[str]:
+        """
+        Load and split a file into chunk texts. Blocking; run it off the event loop.
+
+        Args:
+            file_path (str): Path to the file.
+            file_type (Optional[str]): One of "pdf", "docx", or "zeta".
+
+        Returns:
+            List[str]: Chunk texts ready for embedding.
+        """
+        # Handle file types with optional OpenAI vision extraction
+        if file_type in ("pdf", "docx"):
+            texts = None
+            try:
+                from crm.services.openai_extraction_services import document_to_images  # type: ignore
+                texts = document_to_images(file_path)
+            except Exception as e:
+                logger.warning(f"OpenAI vision extraction unavailable; falling back to text loaders: {e}")
+                try:
+                    if file_type == "pdf":
+                        chunks = self.load_and_split_pdf(file_path, return_documents=False)
+                    else:
+                        chunks = self.load_and_split_docx(file_path, return_documents=False)
+                    texts = [t for t, _ in chunks]
+                except Exception as e2:
+                    raise ImportError(f"No available loader for {file_type}: {e2}")
+        else:
+            loader_map = {
+                "zeta": (self.load_and_split_html, "Zeta (HTML)")
+            }
+            loader_entry = loader_map.get(file_type)
+            if not loader_entry:
+                raise ValueError(f"Unsupported file type: {file_type}")
+            loader_func, file_label = loader_entry
+            logger.debug(f"loader_func: {loader_func}")
+            logger.info(f"Embedding {file_label}...")
+            chunks = loader_func(file_path, return_documents=False)
+            texts = [t for t, _ in chunks]
+
+        # Normalize extracted content to a list of chunks before embedding
+        if isinstance(texts, str):
+            # Chunk long extracted text using token-aware splitter
+            texts = self.token_splitter.split_text(texts)
+        elif isinstance(texts, list) and texts and isinstance(texts[0], str):
+            # Already a list of strings (pages/chunks) — keep as-is
+            pass
+        else:
+            # Safeguard: coerce to single-item list
+            texts = [str(texts)]
+        return texts
 
     async def add_embeddings_from_file(
             self,
@@ -148,45 +267,8 @@ class PDFEmbedder:
             file_type (Optional[str]): One of "pdf", "docx", "zeta", or "mp4".
         """
         try:
-            # Handle file types with optional OpenAI vision extraction
-            if file_type in ("pdf", "docx"):
-                texts = None
-                try:
-                    from crm.services.openai_extraction_services import document_to_images  # type: ignore
-                    texts = document_to_images(file_path)
-                except Exception as e:
-                    logger.warning(f"OpenAI vision extraction unavailable; falling back to text loaders: {e}")
-                    try:
-                        if file_type == "pdf":
-                            docs = self.load_and_split_pdf(file_path)
-                        else:
-                            docs = self.load_and_split_docx(file_path)
-                        texts = [doc.page_content for doc in docs]
-                    except Exception as e2:
-                        raise ImportError(f"No available loader for {file_type}: {e2}")
-            else:
-                loader_map = {
-                    "zeta": (self.load_and_split_html, "Zeta (HTML)")
-                }
-                loader_entry = loader_map.get(file_type)
-                if not loader_entry:
-                    raise ValueError(f"Unsupported file type: {file_type}")
-                loader_func, file_label = loader_entry
-                logger.debug(f"loader_func: {loader_func}")
-                logger.info(f"Embedding {file_label}...")
-                docs = loader_func(file_path)
-                texts = [doc.page_content for doc in docs]
-
-            # Normalize extracted content to a list of chunks before embedding
-            if isinstance(texts, str):
-                # Chunk long extracted text using token-aware splitter
-                texts = self.token_splitter.split_text(texts)
-            elif isinstance(texts, list) and texts and isinstance(texts[0], str):
-                # Already a list of strings (pages/chunks) — keep as-is
-                pass
-            else:
-                # Safeguard: coerce to single-item list
-                texts = [str(texts)]
+            # Loaders and splitters are synchronous; keep them off the event loop
+            texts = await asyncio.to_thread(self._extract_texts, file_path, file_type)
 
             # Use language-aware embeddings for all chunks
             logger.info(
@@ -198,7 +280,7 @@ class PDFEmbedder:
                 },
             )
             embed_start = time.perf_counter()
-            embeddings = await self.embedder.encode(texts)
+            embeddings = await self._encode_with_cache(texts)
             embed_duration = time.perf_counter() - embed_start
             logger.info(
                 "Embeddings generated",
@@ -228,45 +310,53 @@ class PDFEmbedder:
                 except Exception:
                     file_name = None
             
-            points = []
-            for i, embedding in enumerate(embeddings):
-                try:
-                    text_chunk = texts[i]
-                except Exception:
-                    # Length mismatch fallback: skip
-                    continue
-                points.append(
-                    PointStruct(
-                        id=uuid.uuid4().hex,
-                        vector=embedding,
-                        payload={
-                            "resource_id": resource_id,
-                            "file_name": file_name,
-                            "chunk_id": i,
-                            "chunk_index": i,
-                            "text": text_chunk,
-                        },
-                    )
-                )
-            
+            # One contiguous float32 block instead of nested Python float lists
+            vectors = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+            # Pairing by position drops trailing items on a length mismatch, like the old index fallback
+            total_points = min(len(vectors), len(texts))
+
             logger.info(
                 "Upserting embeddings into Qdrant",
                 extra={
                     "file_path": file_path,
-                    "points": len(points),
+                    "points": total_points,
                     "collection": self.collection_name,
                 },
             )
+            # Send columnar Batch messages slice by slice so no per-point PointStruct is built
+            # One urandom read for all point ids instead of a CSPRNG call per point
+            raw_ids = os.urandom(16 * total_points)
+            point_ids = [uuid.UUID(bytes=raw_ids[i * 16:(i + 1) * 16], version=4).hex for i in range(total_points)]
+            points_stored = 0
             upsert_start = time.perf_counter()
-            self.client.upsert(collection_name=self.collection_name, points=points)
+            for start in range(0, total_points, perf_config.db_batch_size):
+                end = min(start + perf_config.db_batch_size, total_points)
+                batch = Batch(
+                    ids=point_ids[start:end],
+                    vectors=vectors[start:end].tolist(),
+                    payloads=[
+                        {
+                            "resource_id": resource_id,
+                            "file_name": file_name,
+                            "chunk_id": i,
+                            "chunk_index": i,
+                            "text": texts[i],
+                        }
+                        for i in range(start, end)
+                    ],
+                )
+                # wait=False lets Qdrant pipeline the write; callers needing read-after-write must upsert with wait=True
+                await asyncio.to_thread(
+                    self.client.upsert, collection_name=self.collection_name, points=batch, wait=False
+                )
+                points_stored += end - start
             upsert_duration = time.perf_counter() - upsert_start
-            self.global_id_counter += len(points)
 
             logger.info(
                 "File processed and stored",
                 extra={
                     "file_path": file_path,
-                    "chunks": len(points),
+                    "chunks": points_stored,
                     "collection": self.collection_name,
                     "upsert_duration_sec": round(upsert_duration, 3),
                 },
@@ -298,20 +388,73 @@ class PDFEmbedder:
 
     async def process_folder(self, folder_path, meta_data=None):
         """
-        Recursively process all supported files in a folder.
+        Recursively process all supported files in a folder, running up to
+        perf_config.max_file_workers file pipelines concurrently; each pipeline's
+        loading and upserts run in worker threads so files genuinely overlap.
 
         Args:
             folder_path (str): Path to the folder containing documents.
             meta_data (Optional[Dict]): Metadata to associate with all files.
         """
-        for root, _, files in os.walk(folder_path):
-            for filename in files:
-                ext = filename.lower().split(".")[-1]
-                file_type = {"pdf": "pdf", "docx": "docx", "html": "zeta"}.get(ext)
+        tasks = list(self._iter_folder_files(folder_path))
+        semaphore = asyncio.Semaphore(max(1, perf_config.max_file_workers))
 
-                file_path = os.path.join(root, filename)
+        async def _process(file_path, file_type):
+            async with semaphore:
                 await self.process_file(file_path, meta_data=meta_data, file_type=file_type)
 
+        # Suspend HNSW indexing for the bulk upload and rebuild once at the end
+        self._set_indexing_threshold(0)
+        try:
+            results = await asyncio.gather(
+                *[_process(file_path, file_type) for file_path, file_type in tasks],
+                return_exceptions=True
+            )
+        finally:
+            self._set_indexing_threshold(QDRANT_INDEXING_THRESHOLD)
+
+        # process_file already logged each failure; surface the first one once every file has run
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+    @staticmethod
+    def _iter_folder_files(folder_path):
+        """
+        Yield (file_path, file_type) for every file under folder_path using os.scandir.
+
+        Args:
+            folder_path (str): Path to the folder to walk.
+        """
+        try:
+            entries = list(os.scandir(folder_path))
+        except OSError as e:
+            # Missing or unreadable folders are skipped, as os.walk did
+            logger.warning(f"Skipping unreadable folder {folder_path}: {e}")
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from PDFEmbedder._iter_folder_files(entry.path)
+            elif entry.is_file():
+                ext = entry.name.lower().split(".")[-1]
+                yield entry.path, {"pdf": "pdf", "docx": "docx", "html": "zeta"}.get(ext)
+
+    def _set_indexing_threshold(self, threshold: int) -> None:
+        """
+        Update the collection's optimizer indexing threshold; failures are logged, not raised.
+
+        Args:
+            threshold (int): New indexing threshold, 0 disables indexing.
+        """
+        try:
+            self.client.update_collection(
+                collection_name=self.collection_name,
+                optimizers_config=OptimizersConfigDiff(indexing_threshold=threshold),
+            )
+            logger.info(f"Set indexing_threshold={threshold} on '{self.collection_name}'")
+        except Exception as e:
+            logger.warning(f"Could not set indexing_threshold on '{self.collection_name}': {e}")
+
     def update_resource_access(self, resource_id: str, assigned_user_ids: List[str], unassigned_user_ids: List[str]) -> None:
         """
         Update access permissions for a resource by adding and removing user IDs.
@@ -332,44 +475,47 @@ class PDFEmbedder:
                 ]
             )
 
-            # Scroll through all points for this resource
-            points = self.client.scroll(
-                collection_name=self.collection_name,
-                scroll_filter=search_filter,
-                limit=100  # Adjust batch size as needed
-            )[0]  # [0] gets points, [1] gets next_page_offset
+            # Scroll through every page of points for this resource
+            points = []
+            offset = None
+            while True:
+                page, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=search_filter,
+                    limit=512,
+                    offset=offset,
+                    with_payload=["access"],
+                    with_vectors=False
+                )
+                points.extend(page)
+                if offset is None:
+                    break
 
             if not points:
                 logger.info(f"No points found for resource_id: {resource_id}")
                 return
 
-            # Update each point's access list
-            updated_points = []
+            # Group points by their new access list so each group is one payload update
+            access_groups: Dict[tuple, List] = {}
             for point in points:
                 # Get current access list
-                current_access = set(point.payload.get("access", []))
+                current_access = set((point.payload or {}).get("access", []))
 
                 # Add new users and remove unassigned users
                 current_access.update(assigned_user_ids)
                 current_access.difference_update(unassigned_user_ids)
 
-                # Create updated point
-                updated_point = PointStruct(
-                    id=point.id,
-                    vector=point.vector,
-                    payload={
-                        **point.payload,
-                        "access": list(current_access)
-                    }
-                )
-                updated_points.append(updated_point)
+                access_groups.setdefault(tuple(sorted(current_access)), []).append(point.id)
 
-            # Update points in batches
-            if updated_points:
-                self.client.upsert(
-                    collection_name=self.collection_name,
-                    points=updated_points
-                )
+            # Mutate the payload server-side; vectors never leave Qdrant
+            if access_groups:
+                for access, point_ids in access_groups.items():
+                    self.client.set_payload(
+                        collection_name=self.collection_name,
+                        payload={"access": list(access)},
+                        points=point_ids,
+                        wait=False
+                    )
                 logger.info(f"Successfully updated access for resource {resource_id}")
                 logger.debug(f"Added users: {assigned_user_ids}")
                 logger.debug(f"Removed users: {unassigned_user_ids}")
@@ -442,37 +588,21 @@ class PDFEmbedder:
         Returns:
             int or None: Safe break point position, or None if no good break found
         """
-        # Look for end of timestamp patterns like "] text"
-        import re
-        
-        # Find all positions where timestamps end ("] " pattern)
-        timestamp_ends = []
-        for match in re.finditer(r'\] ', chunk_candidate):
-            timestamp_ends.append(start_pos + match.end())
-        
-        if timestamp_ends:
-            # Use the last complete timestamp end as break point
-            return timestamp_ends[-1]
+        # Only the last occurrence of each boundary matters, so scan from the right
+        # Prefer the end of the last complete timestamp ("] " pattern)
+        i = chunk_candidate.rfind('] ')
+        if i >= 0:
+            return start_pos + i + 2
         
         # Fallback: try to break at sentence boundaries
-        sentence_ends = []
-        for match in re.finditer(r'[.!?] ', chunk_candidate):
-            sentence_ends.append(start_pos + match.end())
-        
-        if sentence_ends:
-            return sentence_ends[-1]
+        j = max(chunk_candidate.rfind(sep) for sep in ('. ', '! ', '? '))
+        if j >= 0:
+            return start_pos + j + 2
         
-        # Last resort: try to break at word boundaries
-        word_boundaries = []
-        for match in re.finditer(r' ', chunk_candidate):
-            word_boundaries.append(start_pos + match.end())
-        
-        if word_boundaries:
-            # Take last word boundary in the latter half of the chunk
-            mid_point = len(chunk_candidate) // 2
-            for boundary in reversed(word_boundaries):
-                if boundary - start_pos > mid_point:
-                    return boundary
+        # Last resort: last word boundary in the latter half of the chunk
+        k = chunk_candidate.rfind(' ', len(chunk_candidate) // 2)
+        if k >= 0:
+            return start_pos + k + 1
         
         return None
 
@@ -486,11 +616,8 @@ class PDFEmbedder:
         Returns:
             List[Dict]: List of timestamp ranges with start and end times
         """
-        import re
-        
         # Pattern to match timestamps like [12.3s-45.6s]
-        timestamp_pattern = r'\[(\d+\.?\d*)s-(\d+\.?\d*)s\]'
-        matches = re.findall(timestamp_pattern, chunk_text)
+        matches = _RE_TS_RANGE.findall(chunk_text)
         
         timestamps = []
         for start_str, end_str in matches:
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
+from functools import lru_cache
 # from transformers import pipeline
-from langdetect import detect
 from crm.utils.logger import logger
 from crm.services.llm_service import llm
 
@@ -55,6 +55,39 @@ class BasicTitleGenerationStrategy(TitleGenerationStrategy):
         return title
 
 
+_SYSTEM_PROMPT = """
+            You are a world-class headline editor.
+            Your only task is to create a four-word title that perfectly captures the user’s query and answer.
+            Constraints:
+                - Exactly four words, no punctuation, no extra spaces.
+                - Stick to the language of the query
+                - Omit filler words (a, an, the, is, etc.).
+                - Prefer nouns and strong verbs.
+            Respond with the four-word title only.
+        """
+
+_USER_TMPL = "Question: {q}\nTitle:"
+
+
+@lru_cache(maxsize=1024)
+def _llm_title(question: str) -> str:
+    """
+    Description: Ask the LLM for a title, memoizing results so repeated questions skip the round-trip
+    
+    args:
+        question (str): The (already truncated) user question
+    
+    returns:
+        str: Clean, short title returned by the LLM
+    """
+    response = llm.invoke([("system", _SYSTEM_PROMPT), ("user", _USER_TMPL.format(q=question))])
+
+    # Extract content from AIMessage if it's an AIMessage object
+    if hasattr(response, 'content'):
+        return response.content.strip().replace('"', '').strip()
+    return str(response).strip().replace('"', '').strip()
+
+
 class NLPTitleGenerationStrategy(TitleGenerationStrategy):
     """
     Description: Advanced NLP title generation strategy using language detection and LLM-based title generation
@@ -104,30 +137,6 @@ class NLPTitleGenerationStrategy(TitleGenerationStrategy):
         returns:
             str: Clean, short title in the same language as query, falls back to BasicTitleGenerationStrategy on errors
         """
-
-
-        system_prompt = f"""
-            You are a world-class headline editor.
-            Your only task is to create a four-word title that perfectly captures the user’s query and answer.
-            Constraints:
-                - Exactly four words, no punctuation, no extra spaces.
-                - Stick to the language of the query
-                - Omit filler words (a, an, the, is, etc.).
-                - Prefer nouns and strong verbs.
-            Respond with the four-word title only.
-        """
-        
-        user_prompt = (
-            f"Question: {query[:50]}\n"
-            "Title:"
-        )
-
-        response = llm.invoke([("system", system_prompt), ("user", user_prompt)])
-
-        # Extract content from AIMessage if it's an AIMessage object
-        if hasattr(response, 'content'):
-            title = response.content.strip().replace('"', '').strip()
-        else:
-            title = str(response).strip().replace('"', '').strip()
-        return title
+        # Only the first 50 characters of the query reach the prompt, so cache on that
+        return _llm_title(query[:50])
     
\ No newline at end of file
@@ -1,27 +1,82 @@
-from crm.utils.qdrand_db import client
-from qdrant_client.models import VectorParams, Distance
+import threading
+from typing import Literal
+
+from crm.utils.qdrand_db import get_client
+from qdrant_client.models import (
+    VectorParams,
+    Distance,
+    OptimizersConfigDiff,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+)
 from crm.utils.logger import logger
 
-def ensure_qdrant_collection_exists(collection_name: str, embedding_dim: int = 768):
+# Collection names already verified/created in this process; names are stable for its lifetime
+_ensured: set[str] = set()
+_ensured_lock = threading.Lock()
+
+def _quantization_config(quantization: str):
+    """
+    Description: Build the Qdrant quantization config for the requested mode
+
+    args:
+        quantization (str): One of "none", "scalar" (int8, 4x smaller) or "binary" (32x smaller)
+
+    returns:
+        Optional[QuantizationConfig]: Config to pass to create_collection, None for full fp32
+    """
+    if quantization == "scalar":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if quantization == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    if quantization == "none":
+        return None
+    raise ValueError(f"Unsupported quantization mode: {quantization}")
+
+def ensure_qdrant_collection_exists(
+    collection_name: str,
+    embedding_dim: int = 768,
+    bulk_mode: bool = False,
+    quantization: Literal["none", "scalar", "binary"] = "scalar",
+):
     """
-    Description: Ensure a Qdrant collection exists with specified embedding dimensions, create it if not found
+    Description: Ensure a Qdrant collection exists with specified embedding dimensions, create it if not found.
+    Results are memoized per collection name, so only the first call per process hits Qdrant.
     
     args:
         collection_name (str): Name of the Qdrant collection to check or create
         embedding_dim (int): Dimension of the embedding vectors, defaults to 768
+        bulk_mode (bool): Create with indexing disabled (indexing_threshold=0) for a following bulk upload, defaults to False
+        quantization (str): Vector quantization for a newly created collection: "none", "scalar" (int8) or "binary", defaults to "scalar"
     
     returns:
         None: Creates collection if needed, prints status messages
     """
-    collections = client.get_collections().collections
-    if not any(c.name == collection_name for c in collections):
-        client.create_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(
-                size=embedding_dim,
-                distance=Distance.COSINE
+    if collection_name in _ensured:
+        return
+
+    client = get_client()
+    with _ensured_lock:
+        if collection_name in _ensured:
+            return
+
+        if not client.collection_exists(collection_name):
+            client.create_collection(
+                collection_name=collection_name,
+                vectors_config=VectorParams(
+                    size=embedding_dim,
+                    distance=Distance.COSINE
+                ),
+                optimizers_config=OptimizersConfigDiff(indexing_threshold=0) if bulk_mode else None,
+                quantization_config=_quantization_config(quantization)
             )
-        )
-        logger.info(f"✅ Collection '{collection_name}' created.")
-    else:
-        logger.info(f"ℹ️ Collection '{collection_name}' already exists.")
+            logger.info(f"✅ Collection '{collection_name}' created.")
+        else:
+            logger.info(f"ℹ️ Collection '{collection_name}' already exists.")
+
+        _ensured.add(collection_name)
@@ -1,5 +1,7 @@
+import asyncio
+import orjson
 from fastapi import WebSocket
-from typing import List, Dict
+from typing import Dict, Set
 
 
 class ConnectionManager:
@@ -22,7 +24,7 @@ class ConnectionManager:
         returns:
             None
         """
-        self.active_connections: Dict[str, List[WebSocket]] = {}
+        self.active_connections: Dict[str, Set[WebSocket]] = {}
 
     async def connect(self, conversation_id: str, websocket: WebSocket):
         """
@@ -35,9 +37,7 @@ class ConnectionManager:
         returns:
             None: Adds connection to the active connections dictionary
         """
-        if conversation_id not in self.active_connections:
-            self.active_connections[conversation_id] = []
-        self.active_connections[conversation_id].append(websocket)
+        self.active_connections.setdefault(conversation_id, set()).add(websocket)
 
     def disconnect(self, conversation_id: str, websocket: WebSocket):
         """
@@ -50,10 +50,11 @@ class ConnectionManager:
         returns:
             None: Removes connection and cleans up empty conversation groups
         """
-        if conversation_id in self.active_connections:
-            self.active_connections[conversation_id].remove(websocket)
-            if not self.active_connections[conversation_id]:
-                del self.active_connections[conversation_id]
+        connections = self.active_connections.get(conversation_id)
+        if connections is not None:
+            connections.discard(websocket)
+            if not connections:
+                self.active_connections.pop(conversation_id, None)
 
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """
@@ -66,7 +67,7 @@ class ConnectionManager:
         returns:
             None: Sends JSON message to the specified WebSocket
         """
-        await websocket.send_json(message)
+        await websocket.send_text(orjson.dumps(message).decode())
 
     async def broadcast(self, conversation_id: str, message: dict):
         """
@@ -77,8 +78,17 @@ class ConnectionManager:
             message (dict): Message data to broadcast as JSON to all connections
         
         returns:
-            None: Sends JSON message to all connections in the conversation group
+            None: Serializes the message once and sends it to all connections concurrently, dropping connections whose send fails
         """
-        if conversation_id in self.active_connections:
-            for connection in self.active_connections[conversation_id]:
-                await connection.send_json(message)
+        connections = list(self.active_connections.get(conversation_id, ()))
+        if not connections:
+            return
+        # Encode once for the whole group; text frames keep clients parsing event.data as before
+        payload = orjson.dumps(message).decode()
+        results = await asyncio.gather(
+            *[connection.send_text(payload) for connection in connections],
+            return_exceptions=True
+        )
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(conversation_id, connection)
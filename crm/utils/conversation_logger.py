@@ -1,22 +1,19 @@
 # utils/conversation_logger.py
-import json
-import asyncio
+import atexit
+import queue
 import threading
+import time
 import uuid
 import os
+import re
 from datetime import datetime
-from typing import List, Dict, Any
-from nltk.translate.bleu_score import sentence_bleu
-import nltk
+import orjson
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+from crm.utils.bleu import sentence_bleu
 from crm.utils.logger import logger
 import tiktoken
 
-# Ensure NLTK punkt tokenizer is present
-try:
-    nltk.data.find("tokenizers/punkt")
-except LookupError:
-    nltk.download("punkt", quiet=True)
-
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 LOG_DIR = os.path.join(project_root, 'conversation_logs')
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -24,6 +21,87 @@ os.makedirs(LOG_DIR, exist_ok=True)
 RAW_LOG_FILE= os.path.join(LOG_DIR, f"conversations_{datetime.utcnow():%Y_%m_%d}.log")
 ENRICHED_FILE= os.path.join(LOG_DIR, f"conversations_enriched_{datetime.utcnow():%Y_%m_%d}.log")
 LLM_MODEL= "llama3.1:latest"
+TOKEN_COUNT_MODEL = "gpt-3.5-turbo"
+BLEU_MAX_DOCS = 5
+BLEU_MAX_REFERENCE_CHARS = 4000
+HALLUCINATION_MIN_WORDS = 8
+ENRICH_BATCH_SIZE = 64
+ENRICH_BATCH_WINDOW = 0.05
+# A standalone score in [0, 1]; the reply may echo the prompt's "(0-1)" before the actual score
+_SCORE_RE = re.compile(r"\b(?:0(?:\.\d+)?|1(?:\.0+)?)\b")
+
+
+class _BufferedLogWriter:
+    """
+    Long-lived, buffered binary append handle for a JSONL log file.
+    Lines are flushed by a background thread every FLUSH_INTERVAL seconds,
+    or immediately once FLUSH_THRESHOLD lines are pending.
+    """
+    FLUSH_INTERVAL = 0.2
+    FLUSH_THRESHOLD = 64
+
+    def __init__(self, path: str):
+        self._fh = open(path, "ab", buffering=1 << 16)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._closed = threading.Event()
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+        atexit.register(self.close)
+
+    def write_line(self, line: bytes) -> None:
+        with self._lock:
+            self._fh.write(line + b"\n")
+            self._pending += 1
+            if self._pending >= self.FLUSH_THRESHOLD:
+                self._flush_locked()
+
+    def write_lines(self, lines: List[bytes]) -> None:
+        """Append several lines with a single vectored write, bypassing the buffer."""
+        if not lines:
+            return
+        parts = []
+        for line in lines:
+            parts.append(line)
+            parts.append(b"\n")
+        with self._lock:
+            # Drain buffered write_line output first so lines stay in order
+            self._fh.flush()
+            self._pending = 0
+            if hasattr(os, "writev"):
+                written = os.writev(self._fh.fileno(), parts)
+                data = b"".join(parts)
+                if written < len(data):
+                    self._fh.write(data[written:])
+                    self._fh.flush()
+            else:
+                self._fh.write(b"".join(parts))
+                self._fh.flush()
+
+    def _flush_locked(self) -> None:
+        if self._pending and not self._fh.closed:
+            self._fh.flush()
+            self._pending = 0
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.FLUSH_INTERVAL):
+            with self._lock:
+                self._flush_locked()
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+
+_raw_writer = _BufferedLogWriter(RAW_LOG_FILE)
+_enriched_writer = _BufferedLogWriter(ENRICHED_FILE)
+
+
+@lru_cache(maxsize=4)
+def _encoding(model: str) -> "tiktoken.Encoding":
+    """Load a tiktoken encoding once per model; building the BPE tables is expensive."""
+    return tiktoken.encoding_for_model(model)
 
 # ------------------------------------------------------------------
 # Public async entry-point
@@ -42,8 +120,9 @@ async def log_conversation_event(
     related_to_previous: bool = False
 ) -> Dict[str, Any]:
     """
-    Writes the raw event and then spawns a background thread
-    that enriches it with BLEU, hallucination score & latency.
+    Writes the raw event and then queues it for background enrichment
+    with BLEU, hallucination score & latency. The returned event is shared
+    with the enrichment worker and must not be mutated by the caller.
     """
     event = {
         "timestamp": datetime.utcnow().isoformat(),
@@ -65,56 +144,88 @@ async def log_conversation_event(
     }
 
     # Token count
-    input_encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-    output_encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-    input_tokens = input_encoding.encode(prompt)
-    output_tokens = output_encoding.encode(response)
+    # Ordinary encoding: special-token text is counted as plain text rather than rejected
+    input_tokens, output_tokens = _encoding(TOKEN_COUNT_MODEL).encode_ordinary_batch([prompt, response], num_threads=2)
     event["token_count"] = {
-        "input": input_tokens,
-        "output": output_tokens,
-        "total": input_tokens + output_tokens
+        "input": len(input_tokens),
+        "output": len(output_tokens),
+        "total": len(input_tokens) + len(output_tokens)
     }
     logger.info(f"Logging conversation event: {event['event_id']} for user {user_id} in org {org_id}")
 
     # 1. Raw log (fail silently)
     try:
-        with open(RAW_LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        _raw_writer.write_line(orjson.dumps(event, option=orjson.OPT_NON_STR_KEYS))
     except Exception:
         pass
 
-    # 2. Fire-and-forget enrichment
-    threading.Thread(
-        target=_enrich_and_append,
-        args=(event.copy(),),
-        daemon=True
-    ).start()
+    # 2. Fire-and-forget enrichment; drop under backpressure rather than pile up work.
+    # The event is handed over by reference: callers must treat the returned dict as read-only.
+    try:
+        _ENRICH_Q.put_nowait(event)
+    except queue.Full:
+        logger.warning(f"Enrichment queue full, skipping enrichment for event {event['event_id']}")
 
     return event
 
 # ------------------------------------------------------------------
 # Background enrichment
 # ------------------------------------------------------------------
-def _enrich_and_append(event: Dict[str, Any]) -> None:
+_ENRICH_Q: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=256)
+
+
+def _enrich_worker() -> None:
     """
-    Runs in a daemon thread. Adds:
+    Single daemon consumer: drains up to ENRICH_BATCH_SIZE events (or whatever
+    arrives within ENRICH_BATCH_WINDOW), enriches them and appends the batch
+    with one write.
+    """
+    while True:
+        batch = [_ENRICH_Q.get()]
+        deadline = time.monotonic() + ENRICH_BATCH_WINDOW
+        while len(batch) < ENRICH_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_ENRICH_Q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            lines = [line for line in map(_enrich_event, batch) if line is not None]
+            _enriched_writer.write_lines(lines)
+        except Exception:
+            pass  # Silent failure
+        finally:
+            for _ in batch:
+                _ENRICH_Q.task_done()
+
+
+threading.Thread(target=_enrich_worker, name="conversation-enricher", daemon=True).start()
+
+def _enrich_event(event: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Runs on the enrichment worker thread and returns the serialized event, or None on failure. Adds:
       - BLEU (reference = source docs, candidate = LLM response)
-      - Hallucination score (via LLM self-critique)
+      - Hallucination score (via LLM self-critique, skipped for short answers or no sources)
       - Latency breakdown (dummy numbers, replace with real ones)
     """
     try:
         # Build reference corpus
         docs = [chunk["text"] for chunk in event["qdrant_search_result"] if chunk.get("text")]
-        reference = " ".join(docs).split()
+        # Bound the reference so BLEU cost does not grow with retrieval depth
+        reference = " ".join(docs[:BLEU_MAX_DOCS])[:BLEU_MAX_REFERENCE_CHARS].split()
         candidate = event["response"].split()
 
         # BLEU
-        bleu = sentence_bleu([reference], candidate) if reference else 0.0
+        bleu = sentence_bleu(reference, candidate) if reference else 0.0
 
-        # Hallucination via LLM self-critique
-        hallucination = asyncio.run(_hallucination_score_via_llm(
-            event["response"], docs
-        ))
+        # Hallucination via LLM self-critique; skipped (None) when there is nothing to judge,
+        # since the extra LLM call dominates enrichment cost
+        if docs and len(candidate) >= HALLUCINATION_MIN_WORDS:
+            hallucination = round(_hallucination_score_via_llm(event["response"], docs), 4)
+        else:
+            hallucination = None
 
         # Latency placeholder (replace with real metrics if available)
         latency = {
@@ -127,21 +238,19 @@ def _enrich_and_append(event: Dict[str, Any]) -> None:
         # Enrich
         event.update({
             "bleu_score": round(bleu, 4),
-            "hallucination_score": round(hallucination, 4),
+            "hallucination_score": hallucination,
             "latency_breakdown": latency
         })
 
-        # Append silently
-        with open(ENRICHED_FILE, "a", encoding="utf-8") as f:
-            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        return orjson.dumps(event, option=orjson.OPT_NON_STR_KEYS)
 
     except Exception:
-        pass  # Silent failure
+        return None  # Silent failure
 
 # ------------------------------------------------------------------
 # LLM-based hallucination check
 # ------------------------------------------------------------------
-async def _hallucination_score_via_llm(response: str, sources: List[str]) -> float:
+def _hallucination_score_via_llm(response: str, sources: List[str]) -> float:
     """
     Returns 0.0 (perfect) → 1.0 (complete hallucination).
     Uses a short prompt that asks the model to self-critique.
@@ -163,8 +272,15 @@ async def _hallucination_score_via_llm(response: str, sources: List[str]) -> flo
         """
         raw = llm.invoke(prompt).strip()
         logger.debug(f"[Hallucination Score] Raw response: {raw}")
-        score = float(raw.split()[0])
-        return max(0.0, min(1.0, score))
+        return _parse_hallucination_score(raw)
     except Exception:
         return 0.5  # neutral fallback
 
+
+def _parse_hallucination_score(raw: str) -> float:
+    """
+    Returns the last 0-1 score in the evaluator's reply, or 0.5 when there is none.
+    """
+    scores = _SCORE_RE.findall(raw)
+    return float(scores[-1]) if scores else 0.5
+
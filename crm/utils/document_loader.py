@@ -0,0 +1,70 @@
+from functools import lru_cache
+from typing import List, Optional
+
+from crm.configs.performance_config import perf_config
+from crm.utils.table_aware_splitter import TableAwareTextSplitter
+
+# Loader type per file type; "zeta" is the HTML export handled by the embedding pipeline
+_LOADER_NAMES = {
+    "pdf": "PyPDFLoader",
+    "docx": "Docx2txtLoader",
+    "html": "UnstructuredHTMLLoader",
+    "zeta": "UnstructuredHTMLLoader",
+}
+
+
+@lru_cache(maxsize=1)
+def default_splitter() -> TableAwareTextSplitter:
+    """
+    Description: Return this process's table-aware splitter configured from perf_config
+
+    args:
+        None
+
+    returns:
+        TableAwareTextSplitter: Splitter shared by every load_and_split call in the process
+    """
+    return TableAwareTextSplitter(
+        max_tokens=perf_config.max_tokens_per_chunk,
+        overlap_tokens=perf_config.token_overlap
+    )
+
+
+def load_documents(path: str, file_type: str) -> list:
+    """
+    Description: Load a document into LangChain pages; the loaders are imported on first use
+
+    args:
+        path (str): Path to the document
+        file_type (str): One of "pdf", "docx", "html" or "zeta"
+
+    returns:
+        list: LangChain Document objects, one per page or section
+    """
+    loader_name = _LOADER_NAMES.get(file_type)
+    if loader_name is None:
+        raise ValueError(f"Unsupported file type: {file_type}")
+    from langchain_community import document_loaders
+
+    return getattr(document_loaders, loader_name)(path).load()
+
+
+def load_and_split(path: str, file_type: str,
+                   splitter: Optional[TableAwareTextSplitter] = None) -> List[str]:
+    """
+    Description: Load a document and split every page with the table-aware splitter, without
+    touching Qdrant or the embedder, so it is safe and cheap to run in worker processes
+
+    args:
+        path (str): Path to the document
+        file_type (str): One of "pdf", "docx", "html" or "zeta"
+        splitter (Optional[TableAwareTextSplitter]): Splitter to reuse, defaults to default_splitter()
+
+    returns:
+        List[str]: Chunk texts in document order
+    """
+    splitter = splitter or default_splitter()
+    texts: List[str] = []
+    for doc in load_documents(path, file_type):
+        texts.extend(splitter.split_text(doc.page_content))
+    return texts
@@ -1,7 +1,6 @@
 import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Union, Optional
+from typing import AsyncIterator, List, Tuple, Union, Optional
 # from sentence_transformers import SentenceTransformer
 from crm.utils.logger import logger
 import numpy as np
@@ -20,7 +19,6 @@ class AsyncEmbedder:
     def __init__(
         self, 
         model_name: str = settings.EMBEDDING_MODEL, 
-        max_workers: int = 2,
         normalize:bool = True,
         use_openai:bool = True
     ):
@@ -29,11 +27,12 @@ class AsyncEmbedder:
         
         Args:
             model_name (str): Name of the sentence transformer model
-            max_workers (int): Maximum number of worker threads for embedding generation
+
+        Blocking encode calls run on the loop's default executor, sized by THREAD_POOL_SIZE.
         """
+        self.model_name = model_name
         self.use_openai = use_openai
         self.normalize = normalize
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
         logger.info(f"[Embedder Init] model={model_name} use_openai={self.use_openai}")
 
         if self.use_openai:
@@ -48,13 +47,14 @@ class AsyncEmbedder:
         #     self.model = SentenceTransformer(model_name, trust_remote_code=True)
         #     logger.info(f"[Embedder] Using local model: {self.model}")
 
-    def _normalize_embeddings(self, vectors: List[List[float]]) -> List[List[float]]:
+    def _normalize_embeddings(self, vectors: Union[List[List[float]], np.ndarray]) -> np.ndarray:
         """
-        Normalize embedding vectors
+        L2-normalize embedding vectors in place and return them as a float32 ndarray
         """
-        vectors = np.array(vectors)
+        vectors = np.array(vectors, dtype=np.float32)
         norms = np.linalg.norm(vectors, axis=1, keepdims=True)
-        return (vectors/norms).tolist()
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
     
     def _encode_local(self, texts: List[str], batch_size:int=32) -> List[List[float]]:
         """
@@ -87,18 +87,23 @@ class AsyncEmbedder:
         if isinstance(texts, str):
             texts = [texts]
 
-        loop = asyncio.get_event_loop()
         if self.use_openai:
-            embeds = await loop.run_in_executor(self.executor, self._encode_openai, texts)
+            embeds = await asyncio.to_thread(self._encode_openai, texts)
         else:
-            embeds = await loop.run_in_executor(self.executor, self._encode_local, texts, batch_size)
+            embeds = await asyncio.to_thread(self._encode_local, texts, batch_size)
 
-        return embeds        
-    
-    def __del__(self):
-        """Cleanup executor"""
-        if hasattr(self, 'executor'):
-            self.executor.shutdown(wait=False)
+        return embeds
+
+    async def encode_iter(
+        self, texts: List[str], batch_size: int = 64
+    ) -> AsyncIterator[Tuple[List[str], List[List[float]]]]:
+        """
+        Embed texts batch by batch, yielding (batch_texts, batch_embeddings)
+        so callers can consume one batch while the next is being encoded
+        """
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+            yield batch, await self.encode(batch, batch_size)
 
 
 logger.info(f"USE OPENAI: {settings.USE_OPENAI}")
@@ -0,0 +1,151 @@
+"""
+Content-hash cache for chunk embeddings.
+
+Keeps an in-memory LRU in front of an on-disk sqlite store so re-ingesting a file
+(or documents sharing boilerplate) does not re-embed identical chunks.
+Keys are namespaced by embedder model id and dimension, so switching models
+never returns stale vectors.
+"""
+
+import os
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from crm.utils.logger import logger
+
+try:
+    from blake3 import blake3 as _blake3  # type: ignore
+    HASH_NAME = "blake3"
+except ImportError:
+    _blake3 = None
+    HASH_NAME = "blake2b"
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CACHE_DIR = os.path.join(project_root, 'embedding_cache')
+CACHE_FILE = os.path.join(CACHE_DIR, 'embeddings.sqlite3')
+
+
+def content_hash(text: str) -> str:
+    """
+    Description: Hash chunk text with blake3 when available, falling back to blake2b
+
+    args:
+        text (str): Chunk text to hash
+
+    returns:
+        str: Hex digest of the text
+    """
+    data = text.encode("utf-8")
+    if _blake3 is not None:
+        return _blake3(data).hexdigest()
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Description: Two-level (memory LRU + sqlite) cache mapping chunk text to its embedding vector
+
+    args:
+        model_id (str): Embedder identifier (model name and dimension) used as the key namespace
+        path (str): Location of the sqlite database, defaults to CACHE_FILE
+        max_memory_items (int): Number of vectors kept in the in-memory LRU, defaults to 4096
+
+    returns:
+        EmbeddingCache: Instance exposing key/get_many/set_many
+    """
+
+    def __init__(self, model_id: str, path: str = CACHE_FILE, max_memory_items: int = 4096):
+        self.prefix = f"{HASH_NAME}:{model_id}:"
+        self.max_memory_items = max_memory_items
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._db.commit()
+        except Exception as e:
+            logger.warning(f"[EmbeddingCache] Disk cache unavailable, using memory only: {e}")
+            self._db = None
+
+    def key(self, text: str) -> str:
+        """Build the namespaced cache key for a chunk of text."""
+        return self.prefix + content_hash(text)
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        Description: Look up several keys at once, memory first then disk
+
+        args:
+            keys (Iterable[str]): Cache keys produced by key()
+
+        returns:
+            Dict[str, List[float]]: Vectors for the keys that were found
+        """
+        hits: Dict[str, List[float]] = {}
+        missing: List[str] = []
+        with self._lock:
+            for k in keys:
+                vector = self._memory.get(k)
+                if vector is not None:
+                    self._memory.move_to_end(k)
+                    hits[k] = vector
+                else:
+                    missing.append(k)
+
+            if missing and self._db is not None:
+                try:
+                    # Stay well under sqlite's bound-parameter limit
+                    for i in range(0, len(missing), 500):
+                        batch = missing[i:i + 500]
+                        placeholders = ",".join("?" * len(batch))
+                        rows = self._db.execute(
+                            f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                        ).fetchall()
+                        for k, blob in rows:
+                            vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                            hits[k] = vector
+                            self._remember(k, vector)
+                except Exception as e:
+                    logger.warning(f"[EmbeddingCache] Disk lookup failed: {e}")
+        return hits
+
+    def set_many(self, items: Iterable[Tuple[str, List[float]]]) -> None:
+        """
+        Description: Store several (key, vector) pairs in memory and on disk
+
+        args:
+            items (Iterable[Tuple[str, List[float]]]): Pairs of cache key and embedding vector
+
+        returns:
+            None
+        """
+        rows = []
+        with self._lock:
+            for k, vector in items:
+                self._remember(k, vector)
+                rows.append((k, np.asarray(vector, dtype=np.float32).tobytes()))
+
+            if rows and self._db is not None:
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+                    )
+                    self._db.commit()
+                except Exception as e:
+                    logger.warning(f"[EmbeddingCache] Disk write failed: {e}")
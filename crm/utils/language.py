@@ -1,16 +1,34 @@
+from functools import lru_cache
 from langdetect import detect
 from langcodes import Language
 
+# Longer texts are detected directly so the cache never pins large strings
+_MAX_CACHED_TEXT_LEN = 1024
+
+@lru_cache(maxsize=4096)
+def _detect_cached(text: str) -> str:
+    return detect(text)
+
+@lru_cache(maxsize=256)
+def _language_name(lang_code: str) -> str:
+    return Language.get(lang_code).display_name()
+
+# Display names for the languages we see most, resolved once at import
+_LANG_NAMES = {
+    code: _language_name(code)
+    for code in ("en", "es", "fr", "de", "hi", "zh", "ja", "pt", "it", "ar", "ru")
+}
+
 def detect_language(text: str) -> str:
     """
-    Detect language
+    Detect language, memoizing results for repeated short inputs
     Args:
         text(str) : text input for lanauge detection
     Returns:
         (str)
     """
-    lang_code = detect(text)
-    lang_name = Language.get(lang_code).display_name()
+    lang_code = _detect_cached(text) if len(text) <= _MAX_CACHED_TEXT_LEN else detect(text)
+    lang_name = _LANG_NAMES.get(lang_code) or _language_name(lang_code)
     return lang_code, lang_name
 
 def is_same_language(response: str, expected_lang_code: str) -> bool:
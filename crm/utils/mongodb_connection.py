@@ -38,7 +38,17 @@ logger.info(f"Connecting to MongoDB at: {mongo_uri}")
 
 # Attempting to connect to MongoDB
 try:    
-    myclient = pymongo.MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+    # One pooled client per process; compressors that are not installed are skipped by pymongo
+    myclient = pymongo.MongoClient(
+        mongo_uri,
+        maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS,
+        compressors=settings.MONGODB_COMPRESSORS,
+        retryWrites=True,
+        serverSelectionTimeoutMS=5000,
+        appname="crm-email",
+    )
     mydb = myclient[mongodb_db]
     my_collection = mydb[mongodb_collection]
     logger.info("Successfully connected to MongoDB.")
@@ -1,7 +1,9 @@
-import json
 import re
+import orjson
 from crm.utils.logger import logger
 
+_JSON_FENCE = re.compile(r'^```json\s*|\s*```$', re.IGNORECASE)
+
 def parse_response(response: str) -> dict:
     """
     Parse an LLM response that might be wrapped in ```json ... ``` fences.
@@ -12,12 +14,10 @@ def parse_response(response: str) -> dict:
     """
     try:
         # 1. Strip the optional ```json ... ``` wrapper
-        stripped = re.sub(
-            r'^```json\s*|\s*```$', '', response.strip(), flags=re.IGNORECASE
-        ).strip()
+        stripped = _JSON_FENCE.sub('', response.strip()).strip()
 
         # 2. Parse JSON
-        parsed = json.loads(stripped)
+        parsed = orjson.loads(stripped)
 
         # 3. Validate minimal structure
         if isinstance(parsed, dict):
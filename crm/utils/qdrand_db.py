@@ -1,8 +1,19 @@
 import os
 import time
+import errno
+import select
 import socket
-from qdrant_client import QdrantClient
-from qdrant_client.models import VectorParams, Distance
+from functools import lru_cache
+import grpc
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import (
+    VectorParams,
+    Distance,
+    Datatype,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+)
 # from crm.configs.collection_name_configs import COLLECTION_NAME
 from crm.core.settings import get_settings
 from crm.utils.logger import logger
@@ -10,35 +21,68 @@ from crm.utils.logger import logger
 settings = get_settings()
 COLLECTION_NAME = settings.COLLECTION_NAME
 
+def _probe_tcp(host: str, port: int, timeout: float) -> bool:
+    """
+    Description: Check whether a TCP port accepts connections using a non-blocking connect
+    
+    args:
+        host (str): Host address to probe
+        port (int): Port number to probe
+        timeout (float): Seconds to wait for the connect to complete
+    
+    returns:
+        bool: True if the connection was established, False otherwise
+    """
+    try:
+        family, socktype, proto, _, addr = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0]
+        with socket.socket(family, socktype, proto) as sock:
+            sock.setblocking(False)
+            err = sock.connect_ex(addr)
+            if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                return False
+            _, writable, _ = select.select([], [sock], [], timeout)
+            return bool(writable) and sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+    except OSError:
+        return False
+
+
 def wait_for_qdrant(host: str = "", port: int = "",
                     retries: int = 10, delay: int = 2) -> None:
     """
-    Description: Wait until Qdrant is reachable via TCP connection with retry logic
+    Description: Wait until Qdrant is reachable via TCP, probing with exponential backoff
+    (50 ms doubling up to delay) so an already-running server is detected almost immediately
     
     args:
         host (str): Qdrant host address, defaults to DEFAULT_QDRANT_HOST
         port (int): Qdrant port number, defaults to DEFAULT_QDRANT_PORT
-        retries (int): Number of connection attempts, defaults to 10
-        delay (int): Delay between attempts in seconds, defaults to 2
+        retries (int): Together with delay bounds the total wait to retries * delay seconds, defaults to 10
+        delay (int): Maximum delay between attempts in seconds, defaults to 2
     
     returns:
-        None: Returns when connection successful, raises ConnectionError if all retries fail
+        None: Returns when connection successful, raises ConnectionError if Qdrant stays unreachable
     """
-    for attempt in range(1, retries + 1):
-        try:
-            with socket.create_connection((host, port), timeout=2):
-                logger.info(f"Qdrant is reachable at {host}:{port}")
-                return
-        except Exception:
-            logger.error(f"Waiting for Qdrant ({host}:{port})... attempt {attempt}/{retries}")
-            time.sleep(delay)
+    deadline = time.monotonic() + retries * delay
+    backoff = 0.05
+    attempt = 0
+    while True:
+        attempt += 1
+        if _probe_tcp(host, port, timeout=max(0.2, backoff)):
+            logger.info(f"Qdrant is reachable at {host}:{port}")
+            return
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        logger.error(f"Waiting for Qdrant ({host}:{port})... attempt {attempt}")
+        time.sleep(min(backoff, remaining))
+        backoff = min(backoff * 2, delay)
     raise ConnectionError(f"Could not connect to Qdrant at {host}:{port}")
 
 
 def ensure_collection_exists(client: QdrantClient, collection_name: str,
                              embedding_dim: int = settings.EMBEDDING_DIM) -> None:
     """
-    Description: Create the collection in Qdrant if it doesn't already exist with COSINE distance
+    Description: Create the collection in Qdrant if it doesn't already exist with COSINE distance,
+    float16 on-disk vectors and an in-RAM int8 quantized index
     
     args:
         client (QdrantClient): Initialized Qdrant client instance
@@ -53,11 +97,19 @@ def ensure_collection_exists(client: QdrantClient, collection_name: str,
         logger.info(f"Collection '{collection_name}' already exists.")
         return
 
+    # Store originals as float16 on disk and search an int8 copy kept in RAM;
+    # COSINE normalizes vectors server-side before either representation is built.
+    # quantile=0.99 clips outlier components so the int8 range covers the bulk of values
     client.create_collection(
         collection_name=collection_name,
         vectors_config=VectorParams(
             size=embedding_dim,
-            distance=Distance.COSINE
+            distance=Distance.COSINE,
+            datatype=Datatype.FLOAT16,
+            on_disk=True
+        ),
+        quantization_config=ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
         )
     )
     logger.info(f"Collection '{collection_name}' created.")
@@ -66,7 +118,9 @@ def ensure_collection_exists(client: QdrantClient, collection_name: str,
 def initialize_qdrant(host: str = settings.QDRANT_HOST,
                       port: int = settings.QDRANT_PORT,
                       collection_name: str = COLLECTION_NAME,
-                      embedding_dim: int = settings.EMBEDDING_DIM) -> QdrantClient:
+                      embedding_dim: int = settings.EMBEDDING_DIM,
+                      grpc_port: int = settings.QDRANT_GRPC_PORT,
+                      prefer_grpc: bool = settings.QDRANT_PREFER_GRPC) -> QdrantClient:
     """
     Description: Initialize Qdrant client and ensure required collection exists with full setup
     
@@ -75,14 +129,30 @@ def initialize_qdrant(host: str = settings.QDRANT_HOST,
         port (int): Qdrant port number, defaults to DEFAULT_QDRANT_PORT
         collection_name (str): Name of the collection to ensure exists, defaults to configured collection_name
         embedding_dim (int): Dimensionality of vectors, defaults to DEFAULT_EMBEDDING_DIM
+        grpc_port (int): Qdrant gRPC port, defaults to QDRANT_GRPC_PORT
+        prefer_grpc (bool): Use gRPC/protobuf instead of REST/JSON, defaults to QDRANT_PREFER_GRPC
     
     returns:
         QdrantClient: Initialized and verified client with collection ready for use
     """
     wait_for_qdrant(host=host, port=port)
     # Disable compatibility check to avoid noisy warnings in mixed environments
+    # gRPC avoids JSON serialization of every point on bulk upserts; raise the message cap for large batches
     try:
-        client = QdrantClient(host=host, port=port, prefer_grpc=False, timeout=5.0, check_compatibility=False)  # type: ignore
+        client = QdrantClient(
+            host=host,
+            port=port,
+            grpc_port=grpc_port,
+            prefer_grpc=prefer_grpc,
+            grpc_options={
+                "grpc.max_send_message_length": 64 * 1024 * 1024,
+                # Keep the long-lived channel warm so idle periods don't cost a reconnect
+                "grpc.keepalive_time_ms": 30000,
+            },
+            grpc_compression=grpc.Compression.Gzip if settings.QDRANT_GRPC_GZIP else None,
+            timeout=5,
+            check_compatibility=False,
+        )  # type: ignore
     except TypeError:
         # Older client without check_compatibility parameter
         client = QdrantClient(host=host, port=port)
@@ -100,9 +170,54 @@ def initialize_qdrant(host: str = settings.QDRANT_HOST,
     return client
 
 
-client = initialize_qdrant(
-    host=settings.QDRANT_HOST,
-    port=settings.QDRANT_PORT,
-    embedding_dim=settings.EMBEDDING_DIM,
-    collection_name=COLLECTION_NAME
-)
+def create_async_client(host: str = settings.QDRANT_HOST,
+                        port: int = settings.QDRANT_PORT,
+                        grpc_port: int = settings.QDRANT_GRPC_PORT,
+                        prefer_grpc: bool = settings.QDRANT_PREFER_GRPC) -> AsyncQdrantClient:
+    """
+    Description: Create an asyncio Qdrant client with the same transport settings as the shared
+    sync client; it binds to the running event loop, so it is not cached across loops
+    
+    args:
+        host (str): Qdrant host address, defaults to QDRANT_HOST
+        port (int): Qdrant port number, defaults to QDRANT_PORT
+        grpc_port (int): Qdrant gRPC port, defaults to QDRANT_GRPC_PORT
+        prefer_grpc (bool): Use gRPC/protobuf instead of REST/JSON, defaults to QDRANT_PREFER_GRPC
+    
+    returns:
+        AsyncQdrantClient: New client; the caller is responsible for closing it
+    """
+    return AsyncQdrantClient(
+        host=host,
+        port=port,
+        grpc_port=grpc_port,
+        prefer_grpc=prefer_grpc,
+        grpc_options={
+            "grpc.max_send_message_length": 64 * 1024 * 1024,
+            "grpc.keepalive_time_ms": 30000,
+        },
+        grpc_compression=grpc.Compression.Gzip if settings.QDRANT_GRPC_GZIP else None,
+        timeout=5,
+        check_compatibility=False,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_client() -> QdrantClient:
+    """
+    Description: Return the process-wide Qdrant client, creating it on first use so every
+    service shares one pooled gRPC/HTTP connection
+    
+    args:
+        None
+    
+    returns:
+        QdrantClient: Shared client initialized from settings
+    """
+    return initialize_qdrant(
+        host=settings.QDRANT_HOST,
+        port=settings.QDRANT_PORT,
+        embedding_dim=settings.EMBEDDING_DIM,
+        collection_name=COLLECTION_NAME
+    )
+
@@ -2,14 +2,47 @@ import os
 import json
 import logging
 import hashlib
+import orjson
 
 logger = logging.getLogger(__name__)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 RESOURCE_JSON_PATH = os.path.join(BASE_DIR, "resources.json")
 
+# Canonical hash of resources.json plus the (mtime, size) it was computed for,
+# so an unchanged file is never re-read or re-parsed
+_last_hash = None
+_last_stat = None
+
+def _canonical_hash(data) -> bytes:
+    """
+    Description: Hash resource data independently of key order and file formatting
+    
+    args:
+        data: Resource data to hash
+    
+    returns:
+        bytes: 16-byte BLAKE2b digest of the key-sorted orjson encoding
+    """
+    return hashlib.blake2b(orjson.dumps(data, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+
+def _remember_file_hash(digest: bytes) -> None:
+    """
+    Description: Cache the canonical hash for the current resources.json stat
+    
+    args:
+        digest (bytes): Canonical hash of the file's content
+    
+    returns:
+        None
+    """
+    global _last_hash, _last_stat
+    st = os.stat(RESOURCE_JSON_PATH)
+    _last_hash, _last_stat = digest, (st.st_mtime_ns, st.st_size)
+
 def has_changed(new_data):
     """
-    Description: Check if new resource data differs from existing data using MD5 hash comparison
+    Description: Check if new resource data differs from existing data using a BLAKE2b hash comparison.
+    The saved file is only re-read when its mtime or size differs from the last hashed version.
     
     args:
         new_data: New resource data to compare against existing saved data
@@ -17,13 +50,16 @@ def has_changed(new_data):
     returns:
         bool: True if data has changed or file doesn't exist, False if data is identical
     """
-    if not os.path.exists(RESOURCE_JSON_PATH):
+    try:
+        st = os.stat(RESOURCE_JSON_PATH)
+    except FileNotFoundError:
         return True
-    with open(RESOURCE_JSON_PATH, "r", encoding="utf-8") as f:
-        existing = json.load(f)
-    old_hash = hashlib.md5(json.dumps(existing, sort_keys=True).encode()).hexdigest()
-    new_hash = hashlib.md5(json.dumps(new_data, sort_keys=True).encode()).hexdigest()
-    return old_hash != new_hash
+
+    if _last_stat != (st.st_mtime_ns, st.st_size):
+        with open(RESOURCE_JSON_PATH, "rb") as f:
+            existing = orjson.loads(f.read())
+        _remember_file_hash(_canonical_hash(existing))
+    return _last_hash != _canonical_hash(new_data)
 
 # def handle_full_resource_list(message: dict):
 #     file_path = os.path.join(BASE_DIR, "resources.json")
@@ -52,6 +88,7 @@ def handle_full_resource_list(message: dict):
     if has_changed(message):
         with open(RESOURCE_JSON_PATH, "w", encoding="utf-8") as f:
             json.dump(message, f, indent=4)
+        _remember_file_hash(_canonical_hash(message))
         logger.info("[✓] resources.json updated — content changed")
     else:
         logger.info("[~] Skipped writing resources.json — no change detected")
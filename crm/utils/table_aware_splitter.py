@@ -4,9 +4,239 @@ Uses tiktoken for precise token counting and cost estimation.
 """
 
 import re
-import tiktoken
-from typing import List, Tuple, Dict, Any, Optional
+import heapq
+from functools import lru_cache
+import numpy as np
+from typing import Callable, Iterator, List, Tuple, Dict, Any, Optional
 from crm.utils.logger import logger
+from crm.utils.token_text_splitter import CACHED_COUNT_MAX_CHARS, batch_threads, cached_encoding
+
+# HTML table tags (converted content); only the tags themselves are matched, never the body
+_HTML_TABLE_OPEN_RE = re.compile(r'<table[^>]*>', re.IGNORECASE)
+_HTML_TABLE_CLOSE_RE = re.compile(r'</table>', re.IGNORECASE)
+
+
+def _html_table_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Spans of <table ...>...</table> blocks, each ending at the first closing tag after it opens.
+
+    Same matches as finditer(r'<table[^>]*>.*?</table>', DOTALL | IGNORECASE), but each
+    search resumes where the last one stopped, so unclosed tags cannot trigger the lazy
+    body scan again for every later opening tag.
+    """
+    spans = []
+    pos = 0
+    while True:
+        opening = _HTML_TABLE_OPEN_RE.search(text, pos)
+        if opening is None:
+            return spans
+        closing = _HTML_TABLE_CLOSE_RE.search(text, opening.end())
+        if closing is None:
+            # No closing tag anywhere after this point, so no later table can close either
+            return spans
+        spans.append((opening.start(), closing.end()))
+        pos = closing.end()
+
+
+def _strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Offsets of text[start:end].strip() within text."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+# Table kinds reported by table detection
+TABLE_MARKDOWN, TABLE_HTML = 'markdown', 'html'
+
+# Regex patterns for detecting Markdown tables
+TABLE_PATTERNS = (
+    # Standard Markdown table with headers and separator row
+    r'\|[^\n]*\|[\s]*\n\|[\s\-\|:]+\|[\s]*\n(?:\|[^\n]*\|[\s]*\n)+',
+    # Simple table without headers (just rows with pipes)
+    r'\|[^\n]*\|[\s]*\n(?:\|[^\n]*\|[\s]*\n){2,}',
+    # HTML table tags (fallback for converted content)
+    r'<table[^>]*>.*?</table>',
+    # Alternative pattern for tables with consistent pipe separators
+    r'^\|.*\|\s*$[\r\n]+\|[\s\-\|:]+\|\s*$[\r\n]+(?:^\|.*\|\s*$[\r\n]+)+',
+    # Bare pipe blocks without a separator row are caught by the line
+    # classification in _is_table rather than by a backtracking regex
+)
+# One compiled alternation with a named group per pattern, so a single search
+# tells both whether text holds a table and which kind (via m.lastgroup).
+# HTML is left to the linear tag scanner, so no pattern needs DOTALL.
+_ANY_TABLE_RE = re.compile(
+    '|'.join(
+        f'(?P<t{i}>{pattern})' for i, pattern in enumerate(TABLE_PATTERNS)
+        if not pattern.startswith('<table')
+    ),
+    re.IGNORECASE,
+)
+_PATTERN_KINDS = {
+    f't{i}': TABLE_HTML if pattern.startswith('<table') else TABLE_MARKDOWN
+    for i, pattern in enumerate(TABLE_PATTERNS)
+}
+
+# Line kinds produced by _classify_lines
+LINE_OTHER, LINE_PIPE, LINE_SEPARATOR = 0, 1, 2
+_SEPARATOR_CHARS = frozenset('|-: \t\r\n')
+
+
+def _split_lines(text: str) -> List[str]:
+    """text split after every '\\n', keeping the breaks (no empty trailing line)."""
+    lines = [line + '\n' for line in text.split('\n')]
+    lines[-1] = lines[-1][:-1]
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _classify_lines(text: str) -> Tuple[List[str], List[int], bytearray]:
+    """
+    One pass over text classifying each line for table detection.
+
+    Lines end at '\\n' and leading spaces/tabs are ignored, matching _pipe_row_runs.
+
+    Returns:
+        (lines, offsets, kinds): lines keep their line breaks, offsets[i] is where line i
+        starts in text (with a final entry for len(text)), and kinds[i] is LINE_PIPE for a
+        row whose first non-blank character is '|', LINE_SEPARATOR for a '|---|' header
+        separator, and LINE_OTHER otherwise.
+    """
+    lines = _split_lines(text)
+    offsets = [0] * (len(lines) + 1)
+    kinds = bytearray(len(lines))
+    pos = 0
+    for i, line in enumerate(lines):
+        offsets[i] = pos
+        pos += len(line)
+        stripped = line.lstrip(' \t')
+        if stripped.startswith('|'):
+            if '-' in stripped and stripped.count('|') >= 2 and _SEPARATOR_CHARS.issuperset(stripped):
+                kinds[i] = LINE_SEPARATOR
+            else:
+                kinds[i] = LINE_PIPE
+    offsets[-1] = pos
+    return lines, offsets, kinds
+
+
+def _has_markdown_rows(text: str) -> bool:
+    """
+    True when _classify_lines would find a separator row or two consecutive pipe rows.
+
+    Stops at the first such line instead of classifying the whole text.
+    """
+    prev_pipe = False
+    for line in text.split('\n'):
+        stripped = line.lstrip(' \t')
+        if not stripped.startswith('|'):
+            prev_pipe = False
+            continue
+        if prev_pipe or ('-' in stripped and stripped.count('|') >= 2 and _SEPARATOR_CHARS.issuperset(stripped)):
+            return True
+        prev_pipe = True
+    return False
+
+
+def _pipe_row_runs(text: str) -> List[Tuple[int, int]]:
+    """
+    Character spans of every run of two or more consecutive pipe rows.
+
+    Vectorized over the UTF-8 bytes: '\\n', ' ', '\\t' and '|' are single bytes that never
+    occur inside a multi-byte character, so line and row boundaries can be found with
+    array operations instead of a Python loop. A span starts at the run's first pipe and
+    ends after its last line break.
+    """
+    data = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+    if not data.size:
+        return []
+    newlines = np.flatnonzero(data == 0x0A)
+    line_starts = np.concatenate(([0], newlines + 1))
+    line_ends = np.concatenate((newlines + 1, [data.size]))
+    keep = line_starts < data.size
+    line_starts, line_ends = line_starts[keep], line_ends[keep]
+
+    # First byte of each line that is not a space or tab (a line break counts as non-blank)
+    non_blank = np.flatnonzero((data != 0x20) & (data != 0x09))
+    if not non_blank.size:
+        return []
+    idx = np.searchsorted(non_blank, line_starts)
+    found = idx < non_blank.size
+    first = non_blank[np.minimum(idx, non_blank.size - 1)]
+    is_row = found & (first < line_ends) & (data[first] == 0x7C)
+
+    edges = np.diff(np.concatenate(([0], is_row.view(np.int8), [0])))
+    run_first = np.flatnonzero(edges == 1)
+    run_stop = np.flatnonzero(edges == -1)
+    long_runs = run_stop - run_first >= 2
+    byte_starts = first[run_first[long_runs]]
+    byte_ends = line_ends[run_stop[long_runs] - 1]
+    if not byte_starts.size:
+        return []
+
+    if not text.isascii():
+        # Byte offset -> character offset: count UTF-8 lead bytes before it
+        chars_before = np.concatenate(([0], np.cumsum((data & 0xC0) != 0x80)))
+        byte_starts, byte_ends = chars_before[byte_starts], chars_before[byte_ends]
+    return list(zip(byte_starts.tolist(), byte_ends.tolist()))
+
+
+class _TokenIndex:
+    """
+    Token positions of one document, encoded once.
+
+    char_to_tok[i] is the number of tokens that start before character i, so the
+    token count of any slice is an integer subtraction instead of a fresh encode.
+    Falls back to count_fn on the sliced text when no encoding is available.
+    """
+
+    def __init__(self, text: str, encoding, count_fn: Callable[[str], int]):
+        self.text = text
+        self.count_fn = count_fn
+        self.token_starts: Optional[np.ndarray] = None
+        self.char_to_tok: Optional[np.ndarray] = None
+        if encoding is None or not text:
+            return
+        try:
+            tokens = encoding.encode_ordinary(text)
+            # encode_ordinary round-trips exactly, so token byte lengths tile text.encode()
+            byte_lens = np.fromiter(
+                (len(b) for b in encoding.decode_tokens_bytes(tokens)), dtype=np.int64, count=len(tokens)
+            )
+            byte_starts = np.cumsum(byte_lens) - byte_lens
+            utf8 = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+            # Character index of every byte: count of UTF-8 lead bytes seen so far
+            char_of_byte = np.cumsum((utf8 & 0xC0) != 0x80) - 1
+            self.token_starts = char_of_byte[byte_starts]
+            self.char_to_tok = np.searchsorted(
+                self.token_starts, np.arange(len(text) + 1), side="left"
+            ).astype(np.int32)
+        except Exception as e:
+            logger.warning(f"[TableSplitter] Token index unavailable, counting per slice: {e}")
+            self.token_starts = self.char_to_tok = None
+
+    # Slices whose estimate lands this close to a limit are re-encoded exactly
+    LIMIT_MARGIN = 2
+
+    def count(self, start: int, end: int, limit: Optional[int] = None) -> int:
+        """
+        Tokens covering text[start:end]; a token straddling start counts as one.
+        Re-encoding a slice can differ by a token at each cut, so when limit is given and
+        the estimate is within LIMIT_MARGIN of it, the slice is counted exactly instead.
+        """
+        if end <= start:
+            return 0
+        if self.char_to_tok is None:
+            return self.count_fn(self.text[start:end])
+        c2t = self.char_to_tok
+        n = int(c2t[end] - c2t[start])
+        if c2t[start + 1] == c2t[start]:
+            # start falls inside a token
+            n += 1
+        if limit is not None and abs(n - limit) <= self.LIMIT_MARGIN:
+            return self.count_fn(self.text[start:end])
+        return n
 
 
 class TableAwareTextSplitter:
@@ -30,30 +260,22 @@ class TableAwareTextSplitter:
         self.encoding_name = encoding_name
         self.context_window_tokens = context_window_tokens  # New: tokens to keep around tables
 
-        # Initialize tiktoken encoding directly
+        # Shared, process-wide tiktoken encoding
         try:
-            self.encoding = tiktoken.get_encoding(encoding_name)
+            self.encoding = cached_encoding(encoding_name)
             logger.info(f"[TableSplitter] Using {encoding_name} encoding, max_tokens={max_tokens}, overlap={overlap_tokens}, context={context_window_tokens}")
         except Exception as e:
             logger.error(f"[TableSplitter] Failed to initialize tiktoken: {e}")
             # Fallback to simple character approximation
             self.encoding = None
 
-        # Regex patterns for detecting Markdown tables
-        self.table_patterns = [
-            # Standard Markdown table with headers and separator row
-            r'\|[^\n]*\|[\s]*\n\|[\s\-\|:]+\|[\s]*\n(?:\|[^\n]*\|[\s]*\n)+',
-            # Simple table without headers (just rows with pipes)
-            r'\|[^\n]*\|[\s]*\n(?:\|[^\n]*\|[\s]*\n){2,}',
-            # HTML table tags (fallback for converted content)
-            r'<table[^>]*>.*?</table>',
-            # Alternative pattern for tables with consistent pipe separators
-            r'^\|.*\|\s*$[\r\n]+\|[\s\-\|:]+\|\s*$[\r\n]+(?:^\|.*\|\s*$[\r\n]+)+',
-            # More flexible pattern for tables with simple format
-            r'(?:^\|.*\|.*$[\r\n]*)+',  # At least 2 lines with pipes
-            # Catch-all for any text that looks like it might contain table rows
-            r'(?:\|[^\n]*\|[\r\n]*)+',  # Multiple lines with pipes
-        ]
+        # Table detection patterns are compiled once per process, not per splitter
+        self.table_patterns = TABLE_PATTERNS
+        self._any_table_re = _ANY_TABLE_RE
+        self._pattern_kinds = _PATTERN_KINDS
+
+        # Per-instance memo of short-text token counts; separator probes re-count the same slices
+        self._count_cached = lru_cache(maxsize=4096)(self._encode_count)
 
     def count_tokens(self, text: str) -> int:
         """
@@ -68,6 +290,11 @@ class TableAwareTextSplitter:
         if self.encoding is None:
             # Fallback character-based approximation
             return len(text) // 4
+        if len(text) < CACHED_COUNT_MAX_CHARS:
+            return self._count_cached(text)
+        return self._encode_count(text)
+
+    def _encode_count(self, text: str) -> int:
         try:
             tokens = self.encoding.encode(text)
             return len(tokens)
@@ -75,6 +302,32 @@ class TableAwareTextSplitter:
             logger.warning(f"Token counting failed: {e}, using approximation")
             return len(text) // 4
 
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Token counts for several texts in one multi-threaded tiktoken call."""
+        if self.encoding is None or len(texts) < 2:
+            return [self.count_tokens(t) for t in texts]
+        try:
+            encoded = self.encoding.encode_ordinary_batch(texts, num_threads=batch_threads(len(texts)))
+            return [len(tokens) for tokens in encoded]
+        except Exception as e:
+            logger.warning(f"Batch token counting failed: {e}, counting one by one")
+            return [self.count_tokens(t) for t in texts]
+
+    def count_tokens_upper_bound(self, text: str) -> int:
+        """
+        Cheap upper bound on count_tokens without touching the tokenizer.
+
+        Every token covers at least one UTF-8 byte, so the byte length can
+        never undercount. Use it to skip exact counting when text clearly fits.
+
+        Args:
+            text: Text to bound
+
+        Returns:
+            Upper bound on the number of tokens
+        """
+        return len(text.encode('utf-8', 'ignore'))
+
     def estimate_cost(self, text: str, cost_per_1000_tokens: float = 0.00002) -> float:
         """
         Estimate cost of processing text based on token count.
@@ -86,9 +339,25 @@ class TableAwareTextSplitter:
         Returns:
             Estimated cost in USD
         """
+        if not text:
+            return 0.0
         token_count = self.count_tokens(text)
         return (token_count / 1000) * cost_per_1000_tokens
 
+    def estimate_cost_batch(self, texts: List[str], cost_per_1000_tokens: float = 0.00002) -> float:
+        """
+        Estimate the combined cost of several texts with one batched token count.
+
+        Args:
+            texts: Texts to estimate cost for
+            cost_per_1000_tokens: Cost per 1000 tokens in USD
+
+        Returns:
+            Estimated total cost in USD
+        """
+        token_count = sum(self._count_tokens_batch([t for t in texts if t]))
+        return (token_count / 1000) * cost_per_1000_tokens
+
     def _find_tables(self, text: str) -> List[Tuple[int, int, str]]:
         """
         Find all tables in the text and return their positions.
@@ -99,28 +368,7 @@ class TableAwareTextSplitter:
         Returns:
             List of tuples: (start_pos, end_pos, table_content)
         """
-        tables = []
-
-        for i, pattern in enumerate(self.table_patterns):
-            matches = list(re.finditer(pattern, text, re.DOTALL | re.IGNORECASE | re.MULTILINE))
-            logger.debug(f"Pattern {i+1} found {len(matches)} matches")
-            for match in matches:
-                start, end = match.span()
-                table_content = match.group()
-                logger.debug(f"  Match at {start}-{end}: {repr(table_content[:100])}...")
-
-                # Check if this table overlaps with previously found tables
-                overlaps = False
-                for existing_start, existing_end, _ in tables:
-                    if (start < existing_end and end > existing_start):
-                        overlaps = True
-                        break
-
-                if not overlaps:
-                    tables.append((start, end, table_content))
-
-        # Sort by position
-        tables.sort(key=lambda x: x[0])
+        tables = self._find_all_table_regions(text)
         logger.info(f"Total tables found: {len(tables)}")
         return tables
 
@@ -128,55 +376,70 @@ class TableAwareTextSplitter:
         """
         Split text into chunks while preserving table integrity and semantic context.
 
+        Args:
+            text: Input text to split
+
+        Returns:
+            List of text chunks with preserved semantic context
+        """
+        return [text[start:end] for start, end in self._split_spans(text)]
+
+    def _split_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Core of _split_text_around_tables, returning chunk (start, end) offsets into text.
+
         Strategy: Keep tables with surrounding context for semantic preservation.
         Only tables themselves are never split - context may be split if needed.
+        The text is tokenized once; all fit checks are offset arithmetic on that index,
+        and substrings are only materialized by the caller.
 
         Args:
             text: Input text to split
 
         Returns:
-            List of text chunks with preserved semantic context
+            List of (start, end) spans, one per chunk
         """
-        # Find all tables with their positions
-        all_tables = self._find_all_table_regions(text)
+        index = _TokenIndex(text, self.encoding, self.count_tokens)
+
+        # Find all tables with their positions; only offsets are needed here
+        all_tables = self._find_table_spans(text)
 
         if not all_tables:
             logger.info("No tables found, using standard chunking")
-            return self._character_based_split(text)
+            return self._character_based_split_span(text, 0, len(text), index)
 
         logger.info(f"Found {len(all_tables)} table regions for semantic splitting")
 
         chunks = []
         processed_pos = 0
 
-        for table_start, table_end, table_content in all_tables:
+        for table_start, table_end, _ in all_tables:
             # Extract context around the table
-            context_start, context_end, full_context = self._extract_context_window(
-                text, table_start, table_end, self.context_window_tokens
+            context_start, context_end, _ = self._extract_context_window(
+                text, table_start, table_end, self.context_window_tokens, index
             )
 
             # Process any text before this context window
             if context_start > processed_pos:
-                pre_context_text = text[processed_pos:context_start].strip()
-                if pre_context_text:
+                pre_start, pre_end = _strip_span(text, processed_pos, context_start)
+                if pre_start < pre_end:
                     # Split pre-context text normally
-                    pre_chunks = self._character_based_split(pre_context_text)
-                    chunks.extend(pre_chunks)
+                    chunks.extend(self._character_based_split_span(text, pre_start, pre_end, index))
 
             # Check if table + context fits in one chunk
-            context_tokens = self.count_tokens(full_context)
+            context_tokens = index.count(context_start, context_end, self.max_tokens)
 
             if context_tokens <= self.max_tokens:
                 # Perfect! Table + context fits in one chunk - semantic relationship preserved
-                chunks.append(full_context)
-                logger.info(f"Created semantic chunk: table + {context_tokens - self._estimate_table_tokens_only(table_content)} context tokens")
+                chunks.append((context_start, context_end))
+                logger.info(f"Created semantic chunk: table + {context_tokens - index.count(table_start, table_end)} context tokens")
             else:
                 # Context is too large - split it while keeping table together
                 logger.info(f"Context too large ({context_tokens} tokens), splitting around table")
 
                 # Split carefully around the table
                 context_chunks = self._split_context_with_table_intact(
-                    full_context, table_start - context_start, table_end - context_start
+                    text, context_start, context_end, table_start, table_end, index
                 )
                 chunks.extend(context_chunks)
 
@@ -184,10 +447,9 @@ class TableAwareTextSplitter:
 
         # Process any remaining text after the last table
         if processed_pos < len(text):
-            remaining_text = text[processed_pos:].strip()
-            if remaining_text:
-                remaining_chunks = self._character_based_split(remaining_text)
-                chunks.extend(remaining_chunks)
+            rest_start, rest_end = _strip_span(text, processed_pos, len(text))
+            if rest_start < rest_end:
+                chunks.extend(self._character_based_split_span(text, rest_start, rest_end, index))
 
         return chunks
 
@@ -198,30 +460,61 @@ class TableAwareTextSplitter:
         Returns:
             List of (start, end, content) tuples for each table
         """
-        tables = []
-        table_pattern = '|'.join(f'({pattern})' for pattern in self.table_patterns)
-        pattern = f'({table_pattern})'
+        return [(start, end, content) for start, end, content, _ in self._find_table_regions_with_kind(text)]
 
-        for match in re.finditer(pattern, text, re.DOTALL | re.IGNORECASE | re.MULTILINE):
-            start, end = match.span()
-            table_content = match.group()
+    def _find_table_regions_with_kind(self, text: str) -> List[Tuple[int, int, str, str]]:
+        """
+        Find all table regions along with their kind, so callers can pick a split strategy.
 
-            # Avoid overlaps
-            if not any(existing_start <= start < existing_end or
-                      existing_start < end <= existing_end
-                      for existing_start, existing_end, _ in tables):
-                tables.append((start, end, table_content))
+        Returns:
+            List of (start, end, content, kind) tuples, kind being TABLE_MARKDOWN or TABLE_HTML
+        """
+        return [(start, end, text[start:end], kind) for start, end, kind in self._find_table_spans(text)]
 
-        return sorted(tables, key=lambda x: x[0])
+    def _find_table_spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Offsets and kind of every table region, without copying the table text.
+
+        Markdown tables come from a linear line scan; HTML tables from one regex pass.
+
+        Returns:
+            List of (start, end, kind) tuples in document order, kind being TABLE_MARKDOWN or TABLE_HTML
+        """
+        # Both sources are already in document order, so a linear merge replaces a sort
+        markdown_spans = [(start, end, TABLE_MARKDOWN) for start, end in _pipe_row_runs(text)]
+        html_spans = [(start, end, TABLE_HTML) for start, end in _html_table_spans(text)]
+        candidates = heapq.merge(markdown_spans, html_spans, key=lambda span: (span[0], -span[1]))
+
+        # Drop regions overlapping an earlier one
+        tables = []
+        last_end = -1
+        for start, end, kind in candidates:
+            if start >= last_end:
+                tables.append((start, end, kind))
+                last_end = end
+        return tables
 
     def _extract_context_window(self, text: str, table_start: int, table_end: int,
-                               context_tokens: int) -> Tuple[int, int, str]:
+                               context_tokens: int, index: Optional[_TokenIndex] = None) -> Tuple[int, int, str]:
         """
-        Extract a context window around a table with approximately context_tokens tokens.
+        Extract a context window around a table with context_tokens tokens on each side.
+
+        With a token index the window is cut exactly at token boundaries; without one
+        it falls back to an approximate four characters per token.
 
         Returns:
             (context_start, context_end, full_context_text)
         """
+        if index is not None and index.token_starts is not None:
+            token_starts = index.token_starts
+            n_tokens = len(token_starts)
+            # Tokens before the table, then context_tokens more after it
+            first_tok = max(0, int(index.char_to_tok[table_start]) - context_tokens)
+            last_tok = int(index.char_to_tok[table_end]) + context_tokens
+            full_start = min(table_start, int(token_starts[first_tok])) if first_tok < n_tokens else table_start
+            full_end = max(table_end, int(token_starts[last_tok])) if last_tok < n_tokens else len(text)
+            return full_start, full_end, text[full_start:full_end]
+
         # Convert token count to approximate character count
         context_chars = context_tokens * 4  # Rough approximation for context window
 
@@ -243,78 +536,65 @@ class TableAwareTextSplitter:
 
         return full_start, full_end, full_context
 
-    def _estimate_table_tokens_only(self, table_content: str) -> int:
-        """Estimate tokens for table content only (without context)."""
-        return self.count_tokens(table_content)
-
-    def _split_context_with_table_intact(self, context_text: str,
-                                        table_rel_start: int, table_rel_end: int) -> List[str]:
+    def _split_context_with_table_intact(self, text: str, context_start: int, context_end: int,
+                                        table_start: int, table_end: int, index: _TokenIndex) -> List[Tuple[int, int]]:
         """
-        Split context text while keeping the table itself intact.
-        Table position is relative to context_text.
+        Split the context window text[context_start:context_end] while keeping the table itself intact.
+        Table position is given as absolute offsets into text.
 
         Returns:
-            List of chunks, each containing parts of the table's context
+            List of (start, end) chunk spans, each containing parts of the table's context
         """
         chunks = []
-        remainder = context_text
+        pos = context_start
 
-        while remainder:
-            # Find the table position in current remainder
-            table_start_in_chunk = remainder.find(context_text[table_rel_start:table_rel_end])
+        while pos < context_end:
+            # The table never moves, so it is in the remainder until pos passes its start
+            table_in_remainder = pos <= table_start and table_end <= context_end
 
-            if table_start_in_chunk == -1:
+            if not table_in_remainder:
                 # Table not in this remainder, split normally
-                if self.count_tokens(remainder) <= self.max_tokens:
-                    chunks.append(remainder)
+                if index.count(pos, context_end, self.max_tokens) <= self.max_tokens:
+                    chunks.append((pos, context_end))
                     break
                 else:
                     # Split normally since table is not here
-                    chunk = self._split_at_token_limit(remainder)
-                    chunks.append(chunk)
-                    remainder = remainder[len(chunk):]
+                    cut = self._split_at_token_limit(text, pos, context_end, index)
+                    chunks.append((pos, cut))
+                    pos = cut
             else:
                 # Table is in this remainder - ensure it's not split
                 chunk_size_limit = self.max_tokens
 
-                # If we can fit the table + some context
-                table_end_in_chunk = table_start_in_chunk + len(context_text[table_rel_start:table_rel_end])
-
                 # Try to include as much context as possible without exceeding limit
-                potential_end = min(len(remainder), table_end_in_chunk + (chunk_size_limit // 2))
+                potential_end = min(context_end, table_end + (chunk_size_limit // 2))
 
-                potential_chunk = remainder[:potential_end]
-                if self.count_tokens(potential_chunk) <= self.max_tokens:
-                    chunks.append(potential_chunk)
-                    remainder = remainder[potential_end:]
+                if index.count(pos, potential_end, self.max_tokens) <= self.max_tokens:
+                    chunks.append((pos, potential_end))
+                    pos = potential_end
                 else:
                     # Can't even fit the table with minimal context - split before it
-                    pre_table_chunk = remainder[:table_start_in_chunk].strip()
-                    if pre_table_chunk:
-                        if self.count_tokens(pre_table_chunk) <= self.max_tokens:
-                            chunks.append(pre_table_chunk)
+                    pre_start, pre_end = _strip_span(text, pos, table_start)
+                    if pre_start < pre_end:
+                        if index.count(pre_start, pre_end, self.max_tokens) <= self.max_tokens:
+                            chunks.append((pre_start, pre_end))
                         else:
                             # Pre-table text is too large
-                            pre_table_split = self._character_based_split(pre_table_chunk)
-                            chunks.extend(pre_table_split)
+                            chunks.extend(self._character_based_split_span(text, pre_start, pre_end, index))
 
                     # Keep some context with the table
-                    remaining_after_table = remainder[table_end_in_chunk:]
-                    if remaining_after_table:
+                    remaining_after_table = context_end - table_end
+                    if remaining_after_table > 0:
                         # Take some post-table context
-                        post_context_end = min(len(remaining_after_table),
-                                             int(len(remaining_after_table) * 0.3))  # 30% of remaining
-                        table_chunk = remainder[table_start_in_chunk:table_end_in_chunk + post_context_end]
-
-                        if table_chunk:
-                            chunks.append(table_chunk)
-                            remainder = remaining_after_table[post_context_end:]
-                        else:
-                            remainder = remaining_after_table
+                        post_context_end = min(remaining_after_table,
+                                               int(remaining_after_table * 0.3))  # 30% of remaining
+                        chunks.append((table_start, table_end + post_context_end))
+                        pos = table_end + post_context_end
                     else:
-                        remainder = ""
+                        pos = context_end
+
+        return [(start, end) for start, end in chunks if _strip_span(text, start, end)[0] < end]
 
-        return [chunk for chunk in chunks if chunk.strip()]
     def _character_based_split(self, text: str) -> List[str]:
         """
         Smart splitting that uses character's token-aware approach.
@@ -327,46 +607,71 @@ class TableAwareTextSplitter:
         """
         if not text.strip():
             return []
+        index = _TokenIndex(text, self.encoding, self.count_tokens)
+        return [text[start:end] for start, end in self._character_based_split_span(text, 0, len(text), index)]
+
+    def _character_based_split_span(self, text: str, start: int, end: int,
+                                    index: _TokenIndex) -> List[Tuple[int, int]]:
+        """
+        Separator-aware splitting of text[start:end] using a prebuilt token index.
+
+        Args:
+            text: Full document the offsets refer to
+            start: Start offset of the region to split
+            end: End offset of the region to split
+            index: Token index built over text
+
+        Returns:
+            List of stripped (start, end) chunk spans within token limits
+        """
+        start, end = _strip_span(text, start, end)
+        if start >= end:
+            return []
 
         # Use separators that are table-aware and content-preserving
         separators = ["\n\n## ", "\n\n### ", "\n\n", ". ", " "]
 
         chunks = []
-        remaining_text = text
+        initial_length = end - start
         chunk_id = 0
+        # First occurrence of each separator at or after the current start (-1 for none).
+        # start only moves forward and end never grows, so a position is re-searched only
+        # once start passes it, and a missing separator is never searched for again.
+        next_sep: Dict[str, int] = {}
 
-        while remaining_text.strip():
+        while True:
             # Find the best split point within token limits
-            best_split_point = len(remaining_text)
-            best_chunk = remaining_text
+            best_end = end
 
             # Try separators in order of preference
             for separator in separators:
                 # Split on separator
-                parts = remaining_text.split(separator, 1)
-                if len(parts) == 2:
-                    potential_chunk = parts[0] + separator
-                    token_count = self.count_tokens(potential_chunk)
+                sep_pos = next_sep.get(separator)
+                if sep_pos is None or -1 < sep_pos < start:
+                    sep_pos = next_sep[separator] = text.find(separator, start, end)
+                if sep_pos != -1 and sep_pos + len(separator) <= end:
+                    potential_end = sep_pos + len(separator)
+                    token_count = index.count(start, potential_end, self.max_tokens)
 
                     if token_count <= self.max_tokens:
                         # Check if this gives us a better chunk (closer to max_tokens)
                         if len(chunks) == 0 or token_count >= self.max_tokens * 0.8:  # At least 80% of limit
-                            best_chunk = potential_chunk
-                            best_split_point = len(potential_chunk)
+                            best_end = potential_end
                             break
 
             # If no good separator found, force split at token limit
-            if self.count_tokens(best_chunk) > self.max_tokens:
-                best_chunk = self._split_at_token_limit(remaining_text)
+            if index.count(start, best_end, self.max_tokens) > self.max_tokens:
+                best_end = self._split_at_token_limit(text, start, end, index)
 
-            chunks.append(best_chunk.strip())
-            remaining_text = remaining_text[len(best_chunk):].strip()
+            chunks.append(_strip_span(text, start, best_end))
+            start, end = _strip_span(text, best_end, end)
+            if start >= end:
+                break
 
             # Safety check to prevent infinite loops
-            if len(remaining_text) >= len(text):
+            if end - start >= initial_length:
                 logger.warning(f"Split loop detected, forcing cut at token limit")
-                remainder_chunks = self._split_at_token_limit(remaining_text)
-                chunks.extend(remainder_chunks)
+                chunks.append(_strip_span(text, start, self._split_at_token_limit(text, start, end, index)))
                 break
 
             chunk_id += 1
@@ -374,69 +679,119 @@ class TableAwareTextSplitter:
                 logger.error("Too many chunks created, breaking")
                 break
 
-        return [chunk for chunk in chunks if chunk.strip()]
+        return [(start, end) for start, end in chunks if start < end]
 
-    def _split_at_token_limit(self, text: str) -> str:
+    def _split_at_token_limit(self, text: str, start: int, end: int, index: _TokenIndex) -> int:
         """
-        Split text exactly at the token limit using tiktoken.
+        Find where text[start:end] reaches the token limit.
 
         Args:
-            text: Text to split
-            max_tokens: Maximum tokens allowed
+            text: Full document the offsets refer to
+            start: Start offset of the region to cut
+            end: End offset of the region to cut
+            index: Token index built over text
 
         Returns:
-            Text split at token boundary
+            Offset k such that text[start:k] fits in max_tokens (end when the whole region fits)
         """
-        if self.encoding is None or not text:
-            return text[:self.max_tokens * 4]  # Character approximation
+        if index.token_starts is not None:
+            first = int(index.char_to_tok[start])
+            if index.char_to_tok[start + 1] == first:
+                # start falls inside a token, which already counts towards the limit
+                first -= 1
+            limit = first + self.max_tokens
+            # Cut at the start of the first token past the limit; a character split across
+            # tokens is left out whole. Re-encoding the slice can merge differently at its
+            # edges, so step back a token while the exact count still overflows.
+            while True:
+                if limit < len(index.token_starts) and index.token_starts[limit] < end:
+                    cut = int(index.token_starts[limit])
+                else:
+                    # The estimate says the rest of the region fits; that needs the same exact check
+                    cut = end
+                    limit = int(index.char_to_tok[end])
+                if cut <= start + 1 or self.count_tokens(text[start:cut]) <= self.max_tokens:
+                    # Always advance so callers cannot loop
+                    return max(start + 1, cut)
+                limit -= 1
+
+        region = text[start:end]
+        if self.encoding is None or not region:
+            return start + len(region[:self.max_tokens * 4])  # Character approximation
 
         try:
-            tokens = self.encoding.encode(text)
+            tokens = self.encoding.encode(region)
             if len(tokens) <= self.max_tokens:
-                return text
+                return end
 
-            # Decode back to text at token limit
-            limited_tokens = tokens[:self.max_tokens]
-            return self.encoding.decode(limited_tokens)
+            # Decode back to text at token limit, dropping a character cut in half by the limit
+            limited = self.encoding.decode_bytes(tokens[:self.max_tokens]).decode("utf-8", errors="ignore")
+            return start + max(1, len(limited))
         except Exception as e:
             logger.warning(f"Token-based splitting failed: {e}, using approximation")
-            return text[:self.max_tokens * 4]
+            return start + len(region[:self.max_tokens * 4])
 
     def _is_table(self, text: str) -> bool:
         """Check if text contains a table structure."""
-        for pattern in self.table_patterns:
-            if re.search(pattern, text, re.DOTALL | re.IGNORECASE):
-                return True
-        return False
-
-    def _split_large_table(self, table_text: str) -> List[str]:
+        return self._table_kind(text) is not None
+
+    def _table_kind(self, text: str) -> Optional[str]:
+        """Kind of table structure in text (TABLE_MARKDOWN or TABLE_HTML), or None."""
+        if text.count('|') < 4:
+            # Two Markdown rows need at least four pipes; only an HTML table is possible
+            return TABLE_HTML if _html_table_spans(text) else None
+        if _has_markdown_rows(text):
+            # A header separator row, or two consecutive pipe rows, is always a table
+            return TABLE_MARKDOWN
+        if _html_table_spans(text):
+            return TABLE_HTML
+        match = self._any_table_re.search(text)
+        return self._pattern_kinds[match.lastgroup] if match else None
+
+    def _split_large_table(self, table_text: str, kind: Optional[str] = None) -> List[str]:
         """
         Split a large table into smaller chunks while preserving structure.
 
         Args:
             table_text: Large table content
+            kind: TABLE_MARKDOWN or TABLE_HTML when already known from detection
 
         Returns:
             List of table chunks
         """
+        if kind is None:
+            kind = self._table_kind(table_text)
+
         # For Markdown tables, try to split by rows
-        if '|' in table_text and '\n' in table_text:
-            lines = table_text.split('\n')
+        lines, _, kinds = _classify_lines(table_text)
+        if kind != TABLE_HTML and len(lines) > 1 and any(kinds):
+            lines = [line.rstrip('\r\n') for line in lines]
+            # Tokenize every row once; joining rows adds a newline token unless the
+            # newline merges into the row's trailing pipe (e.g. ' |\n')
+            if self.encoding is not None:
+                row_tokens = [len(tokens) for tokens in self.encoding.encode_ordinary_batch(
+                    lines, num_threads=batch_threads(len(lines))
+                )]
+            else:
+                row_tokens = [len(line) // 4 for line in lines]
+            newline_tokens = [0 if line.endswith('|') else 1 for line in lines]
+            header = lines[:2]
+            header_tokens = sum(row_tokens[:2]) + (newline_tokens[0] if len(header) > 1 else 0)
+
             chunks = []
             current_chunk = []
+            current_tokens = 0
 
-            for line in lines:
-                current_chunk.append(line)
-                current_text = '\n'.join(current_chunk)
-                tokens = self.count_tokens(current_text)
-
-                if tokens >= self.max_tokens and len(current_chunk) > 3:  # Keep at least header + separator + 1 row
-                    # Remove the last line to stay under limit
-                    current_chunk.pop()
-                    if current_chunk:
-                        chunks.append('\n'.join(current_chunk))
+            for i, line in enumerate(lines):
+                added = row_tokens[i] + (newline_tokens[i - 1] if current_chunk else 0)
+                if current_tokens + added >= self.max_tokens and len(current_chunk) >= 3:  # Keep at least header + separator + 1 row
+                    chunks.append('\n'.join(current_chunk))
                     # Start new chunk with overlap (keep header and separator)
-                    current_chunk = lines[:2] if len(lines) >= 2 else [lines[0]]
+                    current_chunk = header + [line]
+                    current_tokens = header_tokens + newline_tokens[len(header) - 1] + row_tokens[i]
+                else:
+                    current_chunk.append(line)
+                    current_tokens += added
 
             if current_chunk:
                 chunks.append('\n'.join(current_chunk))
@@ -456,12 +811,30 @@ class TableAwareTextSplitter:
         Returns:
             List of text chunks
         """
+        return list(self.iter_chunks(text))
+
+    def iter_chunks(self, text: str) -> Iterator[str]:
+        """
+        Yield the chunks split_text would return, slicing each one only when it is consumed.
+
+        Chunk boundaries are computed up front as offsets, so callers that check chunks one
+        at a time never hold more than the current chunk's text.
+
+        Args:
+            text: Input text to split
+
+        Yields:
+            Text chunks in document order
+        """
         try:
-            return self._split_text_around_tables(text)
+            spans = self._split_spans(text)
         except Exception as e:
             logger.error(f"Error in table-aware splitting: {e}")
             # Fallback to character-based splitting
-            return self._character_based_split(text)
+            yield from self._character_based_split(text)
+            return
+        for start, end in spans:
+            yield text[start:end]
 
     def split_text_with_metadata(self, text: str, metadata: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
@@ -475,14 +848,15 @@ class TableAwareTextSplitter:
             List of dicts with 'text' and 'metadata' keys
         """
         chunks = self.split_text(text)
+        token_counts = self._count_tokens_batch(chunks)
         result = []
 
-        for i, chunk in enumerate(chunks):
+        for i, (chunk, token_count) in enumerate(zip(chunks, token_counts)):
             chunk_metadata = metadata.copy() if metadata else {}
             chunk_metadata.update({
                 'chunk_id': i,
                 'has_table': self._is_table(chunk),
-                'token_count': self.count_tokens(chunk)
+                'token_count': token_count
             })
             result.append({
                 'text': chunk,
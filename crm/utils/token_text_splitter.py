@@ -1,7 +1,31 @@
+import os
+import re
 import tiktoken
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from crm.utils.logger import logger
 
+# Only texts shorter than this are memoized by count_tokens, bounding the cache's memory
+CACHED_COUNT_MAX_CHARS = 4096
+
+# One "[1.2s-5.4s] content" segment of a video transcript
+_TIMESTAMP_SEGMENT_RE = re.compile(r'(\[\d+\.?\d*s?-\d+\.?\d*s?\][^[]*)')
+
+# tiktoken starts a fresh thread pool for every *_batch call; never spawn more threads than cores
+BATCH_MAX_THREADS = min(8, os.cpu_count() or 1)
+
+
+def batch_threads(n_items: int) -> int:
+    """Worker threads for a tiktoken batch call over n_items inputs."""
+    return max(1, min(BATCH_MAX_THREADS, n_items))
+
+
+@lru_cache(maxsize=4)
+def cached_encoding(encoding_name: str) -> tiktoken.Encoding:
+    """Process-wide tiktoken encoding shared by every splitter instance."""
+    return tiktoken.get_encoding(encoding_name)
+
+
 class TikTokenTextSplitter:
     """
     Token-based text splitter using tiktoken for more accurate chunking.
@@ -22,62 +46,124 @@ class TikTokenTextSplitter:
             max_tokens: Maximum tokens per chunk
             overlap_tokens: Number of overlapping tokens between chunks
         """
-        self.encoding = tiktoken.get_encoding(encoding_name)
+        self.encoding = cached_encoding(encoding_name)
         self.max_tokens = max_tokens
         self.overlap_tokens = overlap_tokens
+        # Per-instance memo of short-text token counts; callers often re-count the same chunk
+        self._count_cached = lru_cache(maxsize=4096)(self._encode_count)
         logger.info(f"[TokenSplitter] Using {encoding_name} encoding, max_tokens={max_tokens}, overlap={overlap_tokens}")
     
     def count_tokens(self, text: str) -> int:
         """Count tokens in text using tiktoken."""
+        if len(text) < CACHED_COUNT_MAX_CHARS:
+            return self._count_cached(text)
+        return self._encode_count(text)
+    
+    def _encode_count(self, text: str) -> int:
         return len(self.encoding.encode(text))
     
-    def split_text(self, text: str) -> List[str]:
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count tokens for several texts in one multi-threaded tiktoken call."""
+        if len(texts) < 2:
+            return [self.count_tokens(t) for t in texts]
+        return [len(tokens) for tokens in self.encoding.encode_batch(texts, num_threads=batch_threads(len(texts)))]
+    
+    def count_tokens_upper_bound(self, text: str) -> int:
+        """Cheap upper bound on count_tokens: every token covers at least one UTF-8 byte."""
+        return len(text.encode('utf-8', 'ignore'))
+    
+    def split_tokens(self, text: str) -> List[List[int]]:
         """
-        Split text into token-based chunks with overlap.
+        Split text into overlapping windows of token ids without decoding them.
         
         Args:
             text: Input text to split
             
         Returns:
-            List of text chunks
+            List of token id lists, one per chunk
         """
         if not text.strip():
             return []
         
         # Encode the entire text
         tokens = self.encoding.encode(text)
-        total_tokens = len(tokens)
+        return [tokens[start:end] for start, end in self._window_bounds(len(tokens))]
+    
+    def _window_bounds(self, total_tokens: int) -> List[Tuple[int, int]]:
+        """
+        (start, end) token offsets of each overlapping window over total_tokens tokens.
         
+        Window i starts at i * stride with stride = max_tokens - overlap_tokens, and the
+        last window is the first one reaching total_tokens. An overlap of max_tokens or
+        more falls back to a stride of one token instead of never advancing.
+        """
         if total_tokens <= self.max_tokens:
-            return [text]
+            return [(0, total_tokens)]
         
-        chunks = []
-        start_idx = 0
+        stride = max(1, self.max_tokens - self.overlap_tokens)
+        # Starts stop once the previous window already reaches the end of the text
+        last_start = total_tokens - self.max_tokens + stride
+        return [
+            (start_idx, min(start_idx + self.max_tokens, total_tokens))
+            for start_idx in range(0, last_start, stride)
+        ]
+    
+    def split_text_with_token_spans(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Split text like split_text, also reporting each chunk's token window.
         
-        while start_idx < total_tokens:
-            # Calculate end index for this chunk
-            end_idx = min(start_idx + self.max_tokens, total_tokens)
-            
-            # Extract chunk tokens
-            chunk_tokens = tokens[start_idx:end_idx]
-            
-            # Decode back to text
-            chunk_text = self.encoding.decode(chunk_tokens)
-            
-            # Clean up and add to chunks
-            if chunk_text.strip():
-                chunks.append(chunk_text.strip())
+        The text is encoded once, so a chunk's token count is end_tok - start_tok
+        and the last window's end_tok is the total, with no re-encoding.
+        
+        Args:
+            text: Input text to split
             
-            # Move start position with overlap
-            if end_idx >= total_tokens:
-                break
-            start_idx = end_idx - self.overlap_tokens
+        Returns:
+            List of (chunk, start_tok, end_tok) tuples
+        """
+        if not text.strip():
+            return []
+        
+        tokens = self.encoding.encode(text)
+        bounds = self._window_bounds(len(tokens))
+        if len(bounds) == 1:
+            return [(text, 0, len(tokens))]
+        
+        decoded = self.encoding.decode_batch(
+            [tokens[start:end] for start, end in bounds], num_threads=batch_threads(len(bounds))
+        )
+        return [
+            (chunk.strip(), start, end)
+            for chunk, (start, end) in zip(decoded, bounds)
+            if chunk.strip()
+        ]
+    
+    def split_text(self, text: str) -> List[str]:
+        """
+        Split text into token-based chunks with overlap.
+        
+        Args:
+            text: Input text to split
             
-            # Prevent infinite loops
-            if start_idx <= 0:
-                start_idx = 1
+        Returns:
+            List of text chunks
+        """
+        if not text.strip():
+            return []
+        if self.count_tokens_upper_bound(text) <= self.max_tokens:
+            # Fits without encoding at all
+            return [text]
+        
+        windows = self.split_tokens(text)
+        if len(windows) <= 1:
+            # Short input is returned verbatim (or not at all when blank)
+            return [text] if windows else []
         
-        logger.debug(f"[TokenSplitter] Split {total_tokens} tokens into {len(chunks)} chunks")
+        # Decode every window in one batched call and drop whitespace-only chunks
+        chunks = [chunk.strip() for chunk in self.encoding.decode_batch(windows, num_threads=batch_threads(len(windows)))]
+        chunks = [chunk for chunk in chunks if chunk]
+        
+        logger.debug(f"[TokenSplitter] Decoded {len(windows)} token windows into {len(chunks)} chunks")
         return chunks
     
     def split_text_with_timestamps(self, text: str) -> List[str]:
@@ -91,56 +177,50 @@ class TikTokenTextSplitter:
         Returns:
             List of text chunks preserving timestamp integrity
         """
-        import re
-        
         if not text.strip():
             return []
         
         # Find all timestamp segments
-        timestamp_pattern = r'(\[\d+\.?\d*s?-\d+\.?\d*s?\][^[]*)'
-        segments = re.findall(timestamp_pattern, text)
+        segments = _TIMESTAMP_SEGMENT_RE.findall(text)
         
         if not segments:
             # No timestamps found, use regular splitting
             return self.split_text(text)
         
-        # Process segments with token-aware chunking
+        # Process segments with token-aware chunking. Each chunk is kept as a list of
+        # segment strings joined once when it is finalized, and every segment is encoded
+        # in one batched call, so nothing is re-encoded or re-concatenated per segment.
         chunks = []
-        current_chunk_tokens = []
-        current_chunk_text = ""
+        current_chunk_tokens: List[int] = []
+        current_chunk_parts: List[str] = []
+        segment_token_lists = self.encoding.encode_batch(segments, num_threads=batch_threads(len(segments)))
         
-        for segment in segments:
-            segment_tokens = self.encoding.encode(segment)
-            segment_token_count = len(segment_tokens)
-            
+        for segment, segment_tokens in zip(segments, segment_token_lists):
             # Check if adding this segment would exceed max tokens
-            if len(current_chunk_tokens) + segment_token_count > self.max_tokens and current_chunk_tokens:
+            if len(current_chunk_tokens) + len(segment_tokens) > self.max_tokens and current_chunk_tokens:
                 # Finalize current chunk
-                if current_chunk_text.strip():
-                    chunks.append(current_chunk_text.strip())
+                chunk_text = " ".join(current_chunk_parts).strip()
+                if chunk_text:
+                    chunks.append(chunk_text)
                 
                 # Start new chunk with overlap
                 if len(chunks) > 0 and self.overlap_tokens > 0:
                     # Get last N tokens from previous chunk for overlap
                     overlap_tokens = current_chunk_tokens[-self.overlap_tokens:]
-                    overlap_text = self.encoding.decode(overlap_tokens)
-                    current_chunk_text = overlap_text + " " + segment
+                    current_chunk_parts = [self.encoding.decode(overlap_tokens), segment]
                     current_chunk_tokens = overlap_tokens + segment_tokens
                 else:
-                    current_chunk_text = segment
+                    current_chunk_parts = [segment]
                     current_chunk_tokens = segment_tokens
             else:
                 # Add to current chunk
-                if current_chunk_text:
-                    current_chunk_text += " " + segment
-                    current_chunk_tokens.extend(segment_tokens)
-                else:
-                    current_chunk_text = segment
-                    current_chunk_tokens = segment_tokens
+                current_chunk_parts.append(segment)
+                current_chunk_tokens.extend(segment_tokens)
         
         # Add final chunk
-        if current_chunk_text.strip():
-            chunks.append(current_chunk_text.strip())
+        chunk_text = " ".join(current_chunk_parts).strip()
+        if chunk_text:
+            chunks.append(chunk_text)
         
         logger.debug(f"[TokenSplitter] Created {len(chunks)} timestamp-aware chunks")
         return chunks
@@ -156,5 +236,21 @@ class TikTokenTextSplitter:
         Returns:
             Estimated cost in USD
         """
+        if not text:
+            return 0.0
         token_count = self.count_tokens(text)
+        return (token_count / 1000) * cost_per_1k_tokens
+    
+    def estimate_cost_batch(self, texts: List[str], cost_per_1k_tokens: float = 0.00010) -> float:
+        """
+        Estimate the combined embedding cost of several texts with one batched token count.
+        
+        Args:
+            texts: Input texts
+            cost_per_1k_tokens: Cost per 1000 tokens (text-embedding-3-small default)
+            
+        Returns:
+            Estimated total cost in USD
+        """
+        token_count = sum(self.count_tokens_batch([t for t in texts if t]))
         return (token_count / 1000) * cost_per_1k_tokens
\ No newline at end of file
@@ -23,21 +23,38 @@ Usage examples:
 
   # Lost (polite close)
   poetry run python scripts/generate_email.py --status lost --latest-email "Not a fit right now"
+
+  # Batch: one JSON payload per line on stdin, one JSON response per line on stdout,
+  # all sent over a single keep-alive connection
+  cat leads.jsonl | poetry run python scripts/generate_email.py --batch -
 """
 
 import argparse
+import http.client
 import json
 import sys
+from typing import Iterable, Iterator
 from urllib import request, error
+from urllib.parse import urlsplit
+
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:  # stdlib fallback when running outside the project environment
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _loads = json.loads
 
 
 def post_json(url: str, payload: dict, headers: dict | None = None) -> dict:
-    data = json.dumps(payload).encode("utf-8")
+    data = _dumps(payload)
     req = request.Request(url, data=data, headers={"Content-Type": "application/json", **(headers or {})})
     try:
         with request.urlopen(req, timeout=60) as resp:
-            body = resp.read().decode("utf-8")
-            return json.loads(body)
+            return _loads(resp.read())
     except error.HTTPError as e:
         try:
             err_body = e.read().decode("utf-8")
@@ -48,6 +65,46 @@ def post_json(url: str, payload: dict, headers: dict | None = None) -> dict:
         raise SystemExit(f"Connection error: {e.reason}")
 
 
+def post_json_many(url: str, payloads: Iterable[dict], headers: dict | None = None) -> Iterator[dict]:
+    """POST each payload to url over one keep-alive connection, yielding the decoded responses."""
+    parts = urlsplit(url)
+    conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    hdrs = {"Content-Type": "application/json", **(headers or {})}
+
+    conn = conn_cls(parts.netloc, timeout=60)
+    try:
+        for payload in payloads:
+            data = _dumps(payload)
+            for attempt in range(2):
+                try:
+                    conn.request("POST", path, body=data, headers=hdrs)
+                    resp = conn.getresponse()
+                    body = resp.read()
+                    break
+                except (http.client.RemoteDisconnected, ConnectionError) as e:
+                    # The server may close an idle keep-alive connection; reconnect once
+                    conn.close()
+                    if attempt:
+                        raise SystemExit(f"Connection error: {e}")
+                except OSError as e:
+                    raise SystemExit(f"Connection error: {e}")
+            if resp.status >= 400:
+                raise SystemExit(f"HTTP {resp.status} {resp.reason}: {body.decode('utf-8', 'replace')}")
+            yield _loads(body)
+    finally:
+        conn.close()
+
+
+def read_jsonl(stream) -> Iterator[dict]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield _loads(line)
+
+
 def build_payload(args: argparse.Namespace) -> dict:
     payload: dict = {"status": args.status}
 
@@ -71,18 +128,28 @@ def build_payload(args: argparse.Namespace) -> dict:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Generate an email via CRM /api/email/compose")
     parser.add_argument("--base-url", default="http://localhost:8000", help="API base URL (default: http://localhost:8000)")
-    parser.add_argument("--status", required=True, choices=["new", "contacted", "qualified", "lost"], help="Lead status")
+    parser.add_argument("--status", choices=["new", "contacted", "qualified", "lost"], help="Lead status")
     parser.add_argument("--past-email", dest="past_email", help="Oldest email body in the thread")
     parser.add_argument("--latest-email", dest="latest_email", help="Most recent email body in the thread")
     parser.add_argument("--recipient-name", dest="recipient_name", help="Recipient name")
     parser.add_argument("--recipient-company", dest="recipient_company", help="Recipient company")
     parser.add_argument("--top-k", type=int, default=6, help="Retrieval top-k (default: 6)")
     parser.add_argument("--verbose", action="store_true", help="Print full JSON response")
+    parser.add_argument("--batch", metavar="FILE", help="JSONL file of payloads ('-' for stdin); prints one JSON response per line")
 
     args = parser.parse_args()
-    payload = build_payload(args)
-
     url = args.base_url.rstrip("/") + "/api/email/compose"
+
+    if args.batch:
+        stream = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+        with stream:
+            for res in post_json_many(url, read_jsonl(stream)):
+                print(json.dumps(res), flush=True)
+        return
+
+    if not args.status:
+        parser.error("--status is required unless --batch is given")
+    payload = build_payload(args)
     res = post_json(url, payload)
 
     if args.verbose:
@@ -3,7 +3,7 @@
 End-to-end pipeline runner for event-driven flow.
 
 Capabilities:
-- Extract a document (pdf/docx/html) into chunks (no local embedding)
+- Extract one or more documents (pdf/docx/html) into chunks (no local embedding)
 - Queue an embedding task via RabbitMQ (create_embedding)
 - Optionally simulate embedding locally and store into Qdrant (for dev)
 - Compose a status-aware email grounded on stored docs (direct service call)
@@ -14,82 +14,79 @@ Examples:
   poetry run python scripts/run_pipeline.py \
     --file /path/to/file.pdf --file-type pdf --queue-only
 
+  # Queue several documents in one run (type taken from each extension)
+  poetry run python scripts/run_pipeline.py \
+    --file /path/to/a.pdf /path/to/b.docx /path/to/c.html --queue-only
+
+  # Serve many runs from one process; each stdin line holds one run's options
+  printf '%s\n' '--status new --past-email "Hi"' '--status lost' | \
+    poetry run python scripts/run_pipeline.py --daemon
+
   # Simulate end-to-end (embed locally, store, then compose)
   poetry run python scripts/run_pipeline.py \
     --file "/home/zeta/Downloads/eng_docuements/pdf/engineering_guides_3 (1).pdf" \
     --file-type pdf \
     --status new --past-email "Intro email body" \
-    --simulate
+    --simulate --batch-size 64 --concurrency 2
 """
 
 import argparse
 import asyncio
-from typing import List
-
-from crm.services.embedder_service import EmbeddingTaskService
-from crm.services.embedding_store_service import QdrantEmbeddingStore
-from crm.services.qdrant_services import PDFEmbedder
-from crm.utils.qdrand_db import client as qdrant_client
-from crm.utils.embedder import embedder as local_embedder
-from crm.services.email_composer_service import EmailComposerService
+import multiprocessing
+import os
+import shlex
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+# Service modules are imported inside the steps that need them, so a compose-only run
+# never loads the document loaders (langchain) or the RabbitMQ producer (pika)
 from crm.models.email_models import ComposeEmailRequest, EmailThreadMessage, StatusEnum
-from crm.core.settings import get_settings
+from crm.core.settings import Settings, get_settings
 
+FILE_TYPE_BY_EXTENSION = {".pdf": "pdf", ".docx": "docx", ".html": "html", ".htm": "html"}
 
-async def simulate_embedding_and_store(texts: List[str]) -> int:
-    """Generate embeddings locally and store them into Qdrant (dev aid)."""
-    embeddings = await local_embedder.encode(texts)
-    store = QdrantEmbeddingStore()
-    return store.store(embeddings=embeddings, chunks=texts)
 
+def _file_type_from_extension(path: str) -> str:
+    """Map a document path to the loader type, defaulting to pdf."""
+    ext = os.path.splitext(path)[1].lower()
+    return FILE_TYPE_BY_EXTENSION.get(ext, "pdf")
 
-def main() -> None:
-    p = argparse.ArgumentParser(description="CRM pipeline runner (event-driven or simulated)")
-    p.add_argument("--file", help="Path to document (pdf/docx/html)")
-    p.add_argument("--file-type", default="pdf", choices=["pdf", "docx", "html"], help="Document type")
-    p.add_argument("--queue-only", action="store_true", help="Only queue embedding task, do not simulate or compose")
-    p.add_argument("--simulate", action="store_true", help="Simulate embedding locally and store to Qdrant")
 
-    # Compose options
-    p.add_argument("--status", choices=["new", "contacted", "qualified", "lost"], help="Email status")
-    p.add_argument("--past-email", dest="past_email", help="First email body in the thread")
-    p.add_argument("--latest-email", dest="latest_email", help="Most recent email body in the thread")
-    p.add_argument("--recipient-name", dest="recipient_name")
-    p.add_argument("--recipient-company", dest="recipient_company")
-    p.add_argument("--top-k", type=int, default=6)
+def _extract_one(job: Tuple[str, str]) -> List[str]:
+    """Split one (path, file_type) document into chunk texts, in this process or a pool worker."""
+    # Extraction needs no Qdrant client or embedder; embedding and upserts stay in the parent
+    from crm.utils.document_loader import load_and_split
 
-    args = p.parse_args()
-    settings = get_settings()
+    path, file_type = job
+    return load_and_split(path, file_type)
 
-    # Step 1: Extract document into text chunks (if file given)
-    texts: List[str] = []
-    if args.file:
-        loader = PDFEmbedder(collection_name=settings.COLLECTION_NAME, client=qdrant_client, embedder=local_embedder)
-        if args.file_type == "pdf":
-            docs = loader.load_and_split_pdf(args.file)
-        elif args.file_type == "docx":
-            docs = loader.load_and_split_docx(args.file)
-        else:
-            docs = loader.load_and_split_html(args.file)
-        texts = [d.page_content for d in docs]
-        print(f"Extracted {len(texts)} chunks from {args.file}")
 
-    # Step 2: Queue embedding task via RMQ
-    if args.file and not args.simulate:
-        svc = EmbeddingTaskService()
-        resp = svc.queue_texts(texts, file_name=args.file, file_path=args.file)
-        print(f"Queued embedding task: {resp}")
-        if args.queue_only:
-            return
+async def simulate_embedding_and_store(texts: List[str], batch_size: int = 64, concurrency: int = 2) -> int:
+    """Embed texts locally in batches and upsert each batch while the next one is encoded (dev aid)."""
+    from crm.services.embedding_store_service import QdrantEmbeddingStore
+    from crm.utils.embedder import embedder as local_embedder
+
+    store = QdrantEmbeddingStore()
+    return await store.astore_batches(
+        local_embedder.encode_iter(texts, batch_size=max(1, batch_size)),
+        total_chunks=len(texts),
+        concurrency=concurrency,
+    )
+
 
+async def _run(args: argparse.Namespace, texts: List[str], settings: Settings) -> None:
+    """Run the async steps (simulated store, then compose) on a single event loop."""
     # Step 3: Simulate embedding + store (dev aid)
     if args.simulate:
-        count = asyncio.run(simulate_embedding_and_store(texts))
+        count = await simulate_embedding_and_store(texts, args.batch_size, args.concurrency)
         print(f"Stored {count} chunks into Qdrant")
 
     # Step 4: Compose email (direct call)
     if args.status:
-        composer = EmailComposerService()
+        from crm.services.email_composer_service import EmailComposerService
+
+        composer = EmailComposerService(settings=settings)
         thread: List[EmailThreadMessage] = []
         if args.past_email:
             thread.append(EmailThreadMessage(subject=None, body=args.past_email))
@@ -103,11 +100,99 @@ def main() -> None:
             recipient_company=args.recipient_company,
             top_k=args.top_k,
         )
-        resp = asyncio.run(composer.compose(req))
+        resp = await composer.compose(req)
         print("\n=== Composed Email ===")
         print("Subject:", resp.subject)
         print("\nBody:\n", resp.body)
 
 
+def _build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="CRM pipeline runner (event-driven or simulated)")
+    p.add_argument("--file", nargs="+", help="Path(s) to documents (pdf/docx/html)")
+    p.add_argument("--file-type", choices=["pdf", "docx", "html"],
+                   help="Document type for every file (default: from each file's extension, else pdf)")
+    p.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                   help="Processes used to extract several files in parallel (default: half the CPUs)")
+    p.add_argument("--queue-only", action="store_true", help="Only queue embedding task, do not simulate or compose")
+    p.add_argument("--simulate", action="store_true", help="Simulate embedding locally and store to Qdrant")
+    p.add_argument("--batch-size", type=int, default=64, help="Chunks per embedding batch and Qdrant upsert when simulating (default: 64)")
+    p.add_argument("--concurrency", type=int, default=2, help="Upserts in flight when simulating (default: 2)")
+
+    # Compose options
+    p.add_argument("--status", choices=["new", "contacted", "qualified", "lost"], help="Email status")
+    p.add_argument("--past-email", dest="past_email", help="First email body in the thread")
+    p.add_argument("--latest-email", dest="latest_email", help="Most recent email body in the thread")
+    p.add_argument("--recipient-name", dest="recipient_name")
+    p.add_argument("--recipient-company", dest="recipient_company")
+    p.add_argument("--top-k", type=int, default=6)
+
+    p.add_argument("--daemon", action="store_true",
+                   help="Keep running and read one set of these options per line from stdin, reusing loaded modules")
+    return p
+
+
+def run_once(args: argparse.Namespace, settings: Settings) -> None:
+    """Run one pipeline invocation (extract, queue, simulate, compose) for parsed arguments."""
+    # Step 1: Extract documents into text chunks (if files given); one splitter serves every file
+    texts: List[str] = []
+    file_texts: List[Tuple[str, List[str]]] = []
+    if args.file:
+        jobs = [(path, args.file_type or _file_type_from_extension(path)) for path in args.file]
+        workers = min(len(jobs), max(1, args.workers))
+        if workers > 1:
+            # Parsing and splitting are CPU-bound. Spawn rather than fork so no gRPC channel the
+            # parent may hold is inherited; workers only import the loaders and the splitter
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                results = list(pool.map(_extract_one, jobs))
+        else:
+            results = [_extract_one(job) for job in jobs]
+        for path, chunks in zip(args.file, results):
+            print(f"Extracted {len(chunks)} chunks from {path}")
+            file_texts.append((path, chunks))
+            texts.extend(chunks)
+
+    # Step 2: Queue embedding tasks via RMQ, one message per file published over a single connection
+    if args.file and not args.simulate:
+        from crm.services.embedder_service import EmbeddingTaskService
+
+        svc = EmbeddingTaskService(settings=settings)
+        for path, chunks in file_texts:
+            if not chunks:
+                print(f"Skipping {path}: no chunks extracted")
+        for resp in svc.queue_files([(path, chunks) for path, chunks in file_texts if chunks]):
+            print(f"Queued embedding task: {resp}")
+        if args.queue_only:
+            return
+
+    # Steps 3-4 share one event loop so async clients stay warm between them
+    asyncio.run(_run(args, texts, settings))
+
+
+def serve_stdin(parser: argparse.ArgumentParser, settings: Settings) -> None:
+    """Daemon mode: run one pipeline per stdin line so imports and the loader are paid for once."""
+    for line in sys.stdin:
+        argv = shlex.split(line)
+        if not argv:
+            continue
+        try:
+            run_once(parser.parse_args(argv), settings)
+        except SystemExit:
+            # argparse already printed the usage error; keep serving
+            continue
+        except Exception as e:
+            print(f"Run failed: {e}", file=sys.stderr)
+        sys.stdout.flush()
+
+
+def main() -> None:
+    parser = _build_parser()
+    args = parser.parse_args()
+    settings = get_settings()
+    if args.daemon:
+        serve_stdin(parser, settings)
+    else:
+        run_once(args, settings)
+
+
 if __name__ == "__main__":
     main()
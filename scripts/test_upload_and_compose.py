@@ -22,22 +22,44 @@ Usage examples:
 """
 
 import argparse
+import http.client
 import json
-import mimetypes
 import os
 import sys
 import time
 from urllib import request, error
+from urllib.parse import urlencode, urlsplit
 from uuid import uuid4
 
+# Backoff between indexing checks after upload; about 1.5 s in total before composing anyway
+READY_POLL_DELAYS = (0.05, 0.1, 0.2, 0.4, 0.8)
+
+# The upload endpoint only takes these document types; anything else goes as raw bytes
+_MIME = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".html": "text/html",
+    ".htm": "text/html",
+}
+
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:  # stdlib fallback when running outside the project environment
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _loads = json.loads
+
 
 def _http_json(url: str, payload: dict, timeout: int = 120) -> tuple[int, dict | str]:
-    data = json.dumps(payload).encode("utf-8")
+    data = _dumps(payload)
     req = request.Request(url, data=data, headers={"Content-Type": "application/json"})
     try:
         with request.urlopen(req, timeout=timeout) as resp:
-            body = resp.read().decode("utf-8")
-            return resp.status, json.loads(body)
+            return resp.status, _loads(resp.read())
     except error.HTTPError as e:
         try:
             body = e.read().decode("utf-8")
@@ -49,56 +71,77 @@ def _http_json(url: str, payload: dict, timeout: int = 120) -> tuple[int, dict |
 
 
 def _http_multipart(url: str, field_name: str, file_path: str, timeout: int = 600) -> tuple[int, dict | str]:
-    # Build a simple multipart/form-data payload manually (no extra deps)
+    # Build a simple multipart/form-data payload manually (no extra deps); the file
+    # itself goes from disk to the socket with sendfile (zero-copy on plain HTTP)
     boundary = "----CRMFormBoundary" + uuid4().hex
 
     filename = os.path.basename(file_path)
-    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    content_type = _MIME.get(os.path.splitext(filename)[1].lower(), "application/octet-stream")
     try:
-        with open(file_path, "rb") as f:
-            file_bytes = f.read()
-    except Exception as e:
+        file_size = os.path.getsize(file_path)
+    except OSError as e:
         return 0, f"Failed to read file: {e}"
 
-    parts = []
-    # File part
-    parts.append(f"--{boundary}\r\n".encode("utf-8"))
-    parts.append(
-        (
-            f"Content-Disposition: form-data; name=\"{field_name}\"; filename=\"{filename}\"\r\n"
-            f"Content-Type: {content_type}\r\n\r\n"
-        ).encode("utf-8")
-    )
-    parts.append(file_bytes)
-    parts.append(b"\r\n")
-    # End boundary
-    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
-
-    body = b"".join(parts)
-    headers = {
-        "Content-Type": f"multipart/form-data; boundary={boundary}",
-        "Content-Length": str(len(body)),
-        # Avoid 100-continue stalls on some proxies
-        "Expect": "",
-    }
-
-    req = request.Request(url, data=body, headers=headers)
+    prologue = (
+        f"--{boundary}\r\n"
+        f"Content-Disposition: form-data; name=\"{field_name}\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode("utf-8")
+    # Close the file part, then the end boundary
+    epilogue = f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+    parts = urlsplit(url)
+    conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+
+    conn = conn_cls(parts.netloc, timeout=timeout)
     try:
-        with request.urlopen(req, timeout=timeout) as resp:
-            resp_body = resp.read().decode("utf-8")
-            # Try JSON first, else return raw text
-            try:
-                return resp.status, json.loads(resp_body)
-            except Exception:
-                return resp.status, resp_body
-    except error.HTTPError as e:
+        with open(file_path, "rb") as f:
+            conn.putrequest("POST", path)
+            conn.putheader("Content-Type", f"multipart/form-data; boundary={boundary}")
+            conn.putheader("Content-Length", str(len(prologue) + file_size + len(epilogue)))
+            conn.endheaders()
+            conn.send(prologue)
+            # socket.sendfile falls back to buffered send() for TLS sockets
+            conn.sock.sendfile(f)
+            conn.send(epilogue)
+
+        resp = conn.getresponse()
+        resp_body = resp.read()
+        # Try JSON first, else return raw text
         try:
-            err_body = e.read().decode("utf-8")
+            return resp.status, _loads(resp_body)
         except Exception:
-            err_body = str(e)
-        return e.code, err_body
-    except error.URLError as e:
-        return 0, f"Connection error: {e.reason}"
+            return resp.status, resp_body.decode("utf-8", errors="replace")
+    except FileNotFoundError as e:
+        return 0, f"Failed to read file: {e}"
+    except (OSError, http.client.HTTPException) as e:
+        return 0, f"Connection error: {e}"
+    finally:
+        conn.close()
+
+
+def _http_get_json(url: str, timeout: int = 10) -> tuple[int, dict | str]:
+    try:
+        with request.urlopen(url, timeout=timeout) as resp:
+            return resp.status, _loads(resp.read())
+    except error.HTTPError as e:
+        return e.code, str(e)
+    except (error.URLError, ValueError) as e:
+        return 0, f"Connection error: {e}"
+
+
+def _wait_until_indexed(base: str, resource_id: str, expected_chunks: int) -> bool:
+    """Poll the document status endpoint until the upload's chunks are in Qdrant or the backoff runs out."""
+    status_url = f"{base}/api/documents/status?{urlencode({'resource_id': resource_id})}"
+    for delay in READY_POLL_DELAYS:
+        code, out = _http_get_json(status_url)
+        if code == 200 and isinstance(out, dict) and out.get("indexed_chunks", 0) >= expected_chunks:
+            return True
+        time.sleep(delay)
+    return False
 
 
 def main() -> None:
@@ -122,10 +165,13 @@ def main() -> None:
     code, out = _http_multipart(upload_url, "file", args.file)
     print(f"→ HTTP {code}")
     print(out if isinstance(out, str) else json.dumps(out, indent=2))
-    if code != 200:
+    # The upload endpoint answers 202 Accepted once the embedding task is queued
+    if not 200 <= code < 300:
         sys.exit(1)
 
-    time.sleep(1.0)  # small pause before composing
+    resource_id = out.get("resource_id") if isinstance(out, dict) else None
+    if resource_id and not _wait_until_indexed(base, resource_id, out.get("chunks") or 1):
+        print("→ Chunks not indexed yet; composing with whatever is already stored")
 
     payload = {"status": args.status}
     thread = []
@@ -5,6 +5,22 @@ Debug script for table regex patterns.
 
 import re
 
+# Compiled once per process rather than re-parsed on every finditer call
+_TABLE_PATTERNS = [
+    re.compile(pattern, re.MULTILINE | re.DOTALL)
+    for pattern in (
+        # Standard Markdown table with headers and separator row
+        r'\|[^\n]*\|[\s]*\n\|[\s\-\|:]+\|[\s]*\n(?:\|[^\n]*\|[\s]*\n)+',
+        # Simple table without headers (just rows with pipes)
+        r'\|[^\n]*\|[\s]*\n(?:\|[^\n]*\|[\s]*\n){2,}',
+        # HTML table tags (fallback for converted content)
+        r'<table[^>]*>.*?</table>',
+        # Alternative pattern for tables with consistent pipe separators
+        r'^\|.*\|\s*$[\r\n]+\|[\s\-\|:]+\|\s*$[\r\n]+(?:^\|.*\|\s*$[\r\n]+)+',
+    )
+]
+_SIMPLE_TABLE = re.compile(r'\|.*\|[\s]*\n\|[\s\-\|:]+\|[\s]*\n(?:\|.*\|[\s]*\n)+', re.MULTILINE)
+
 def test_table_regex():
     """Test table regex patterns."""
 
@@ -27,28 +43,16 @@ This is analysis text.
     print("\n" + "="*50)
 
     # Test patterns
-    patterns = [
-        # Standard Markdown table with headers and separator row
-        r'\|[^\n]*\|[\s]*\n\|[\s\-\|:]+\|[\s]*\n(?:\|[^\n]*\|[\s]*\n)+',
-        # Simple table without headers (just rows with pipes)
-        r'\|[^\n]*\|[\s]*\n(?:\|[^\n]*\|[\s]*\n){2,}',
-        # HTML table tags (fallback for converted content)
-        r'<table[^>]*>.*?</table>',
-        # Alternative pattern for tables with consistent pipe separators
-        r'^\|.*\|\s*$[\r\n]+\|[\s\-\|:]+\|\s*$[\r\n]+(?:^\|.*\|\s*$[\r\n]+)+',
-    ]
-
-    for i, pattern in enumerate(patterns):
-        print(f"\nPattern {i+1}: {pattern}")
-        matches = list(re.finditer(pattern, test_text, re.MULTILINE | re.DOTALL))
+    for i, pattern in enumerate(_TABLE_PATTERNS):
+        print(f"\nPattern {i+1}: {pattern.pattern}")
+        matches = list(pattern.finditer(test_text))
         print(f"Matches found: {len(matches)}")
         for match in matches:
             print(f"  Match: {repr(match.group())}")
 
     # Test simpler pattern
-    simple_pattern = r'\|.*\|[\s]*\n\|[\s\-\|:]+\|[\s]*\n(?:\|.*\|[\s]*\n)+'
-    print(f"\nSimple pattern: {simple_pattern}")
-    matches = list(re.finditer(simple_pattern, test_text, re.MULTILINE))
+    print(f"\nSimple pattern: {_SIMPLE_TABLE.pattern}")
+    matches = list(_SIMPLE_TABLE.finditer(test_text))
     print(f"Simple matches found: {len(matches)}")
     for match in matches:
         print(f"  Match: {repr(match.group())}")
@@ -3,6 +3,9 @@
 Optimized chunk size configuration based on research for CRM system.
 """
 
+from types import MappingProxyType
+from typing import Mapping
+
 # OPTIMIZED CONFIGURATION FOR YOUR USE CASE
 OPTIMAL_CHUNK_CONFIGS = {
     # For OpenAI text-embedding-3-small (your primary model)
@@ -90,7 +93,21 @@ USE_CASE_RECOMMENDATIONS = {
     }
 }
 
-def get_optimal_config(content_type: str, embedding_model: str) -> dict:
+# Per-content-type defaults; the model's base config is layered on top
+CONTENT_TYPE_DEFAULTS = {
+    "video": {"max_tokens_per_chunk": 800, "token_overlap": 160},
+    "document": {"max_tokens_per_chunk": 1000, "token_overlap": 200},
+}
+
+# Every (content_type, embedding_model) combination merged once at import time;
+# None stands for any other content type, which gets the base config unchanged
+_RESOLVED = {
+    (content_type, model): MappingProxyType({**CONTENT_TYPE_DEFAULTS.get(content_type, {}), **base_config})
+    for content_type in (*CONTENT_TYPE_DEFAULTS, None)
+    for model, base_config in OPTIMAL_CHUNK_CONFIGS.items()
+}
+
+def get_optimal_config(content_type: str, embedding_model: str) -> Mapping:
     """
     Get optimal configuration for specific content type and embedding model.
     
@@ -99,26 +116,12 @@ def get_optimal_config(content_type: str, embedding_model: str) -> dict:
         embedding_model: 'openai', 'nomic'
     
     Returns:
-        dict: Optimal configuration parameters
+        Mapping: Optimal configuration parameters (read-only, shared between calls)
     """
     
-    base_config = OPTIMAL_CHUNK_CONFIGS.get(embedding_model, OPTIMAL_CHUNK_CONFIGS["openai"])
-    
-    # Adjust based on content type
-    if content_type == "video":
-        return {
-            "max_tokens_per_chunk": 800,
-            "token_overlap": 160,
-            **base_config
-        }
-    elif content_type == "document":
-        return {
-            "max_tokens_per_chunk": 1000,
-            "token_overlap": 200, 
-            **base_config
-        }
-    else:
-        return base_config
+    model = embedding_model if embedding_model in OPTIMAL_CHUNK_CONFIGS else "openai"
+    kind = content_type if content_type in CONTENT_TYPE_DEFAULTS else None
+    return _RESOLVED[(kind, model)]
 
 if __name__ == "__main__":
     print("=== OPTIMIZED CHUNK CONFIGURATION ANALYSIS ===")
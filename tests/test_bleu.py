@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Test suite for the vectorized sentence BLEU
+"""
+
+import unittest
+
+from crm.utils.bleu import sentence_bleu
+
+
+class TestSentenceBleu(unittest.TestCase):
+    """Scores match nltk's sentence_bleu (single reference, uniform weights, no smoothing)"""
+
+    def test_identical_sentences(self):
+        """An exact match scores 1.0"""
+        tokens = "the quick brown fox jumps over the lazy dog".split()
+        self.assertAlmostEqual(sentence_bleu(tokens, tokens), 1.0)
+
+    def test_partial_overlap(self):
+        """Clipped n-gram precision and brevity penalty match the nltk reference value"""
+        reference = "the cat sat on the mat today".split()
+        candidate = "the cat sat on a mat today".split()
+        self.assertAlmostEqual(sentence_bleu(reference, candidate), 0.488923022434901)
+
+    def test_brevity_penalty(self):
+        """A short candidate is penalized even when all its n-grams match"""
+        reference = "the quick brown fox jumps over the lazy dog".split()
+        candidate = "the quick brown fox jumps".split()
+        self.assertAlmostEqual(sentence_bleu(reference, candidate), 0.44932896411722156)
+
+    def test_no_higher_order_match(self):
+        """Missing 4-gram matches yield 0.0 like unsmoothed nltk"""
+        self.assertEqual(sentence_bleu("a b c d e".split(), "e d c b a".split()), 0.0)
+        self.assertEqual(sentence_bleu("a b c".split(), []), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
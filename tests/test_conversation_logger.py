@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Test suite for conversation logger score parsing
+"""
+
+import unittest
+
+from crm.utils.conversation_logger import _parse_hallucination_score
+
+
+class TestHallucinationScoreParsing(unittest.TestCase):
+    """Test how the evaluator's free-text reply is turned into a 0-1 score"""
+
+    def test_bare_score(self):
+        """A reply holding only the number is read as is"""
+        self.assertEqual(_parse_hallucination_score("0.25"), 0.25)
+        self.assertEqual(_parse_hallucination_score("1"), 1.0)
+
+    def test_echoed_prompt(self):
+        """The prompt's "(0-1)" echoed before the answer is not taken as the score"""
+        raw = "Hallucination score (0-1): 0.3"
+        self.assertEqual(_parse_hallucination_score(raw), 0.3)
+
+    def test_out_of_range_numbers_are_ignored(self):
+        """Numbers outside 0-1, like a "1/10" rating, do not shadow the final score"""
+        raw = "Score: 1/10 on a ten point scale, so the hallucination score is 0.1"
+        self.assertEqual(_parse_hallucination_score(raw), 0.1)
+
+    def test_no_score(self):
+        """Replies without a 0-1 number fall back to the neutral 0.5"""
+        self.assertEqual(_parse_hallucination_score("I cannot tell."), 0.5)
+        self.assertEqual(_parse_hallucination_score("About 42 percent"), 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test suite for the chunk embedding cache
+"""
+
+import os
+import tempfile
+import unittest
+
+from crm.utils.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Test memory + disk behaviour of EmbeddingCache"""
+
+    def setUp(self):
+        """Set up a cache backed by a temporary sqlite file"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "embeddings.sqlite3")
+        self.cache = EmbeddingCache("test-model:3", path=self.path, max_memory_items=1)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_roundtrip_and_misses(self):
+        """Stored vectors come back; unknown keys are simply absent"""
+        keys = [self.cache.key("alpha"), self.cache.key("beta")]
+        self.cache.set_many([(keys[0], [1.0, 2.0, 3.0]), (keys[1], [4.0, 5.0, 6.0])])
+
+        hits = self.cache.get_many(keys + [self.cache.key("gamma")])
+        self.assertEqual(hits[keys[0]], [1.0, 2.0, 3.0])
+        self.assertEqual(hits[keys[1]], [4.0, 5.0, 6.0])
+        self.assertEqual(len(hits), 2)
+
+    def test_persists_across_instances(self):
+        """A fresh instance reads vectors written by a previous one"""
+        key = self.cache.key("alpha")
+        self.cache.set_many([(key, [0.5, 0.25])])
+
+        reopened = EmbeddingCache("test-model:3", path=self.path)
+        self.assertEqual(reopened.get_many([key]), {key: [0.5, 0.25]})
+
+    def test_model_namespace(self):
+        """Keys differ between embedder models so vectors are never mixed"""
+        other = EmbeddingCache("other-model:3", path=self.path)
+        self.assertNotEqual(self.cache.key("alpha"), other.key("alpha"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test suite for the batched async Qdrant embedding store
+"""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from crm.services import embedding_store_service
+
+
+class TestAstoreBatches(unittest.TestCase):
+    """Test QdrantEmbeddingStore.astore_batches against a mocked async client"""
+
+    def setUp(self):
+        """Build a store whose sync and async Qdrant clients are mocks"""
+        self.async_client = mock.AsyncMock()
+        for name, value in (("get_client", mock.MagicMock()), ("create_async_client", lambda: self.async_client)):
+            patcher = mock.patch.object(embedding_store_service, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.store = embedding_store_service.QdrantEmbeddingStore(collection_name="test", embedding_dim=2)
+
+    @staticmethod
+    async def _batches(pairs):
+        for chunks, embeddings in pairs:
+            yield chunks, embeddings
+
+    def _run(self, pairs, **kwargs):
+        return asyncio.run(self.store.astore_batches(self._batches(pairs), **kwargs))
+
+    def test_upserts_every_batch_with_running_chunk_index(self):
+        """Each batch is upserted once and chunk indexes continue across batches"""
+        pairs = [(["a", "b"], [[0.1, 0.2], [0.3, 0.4]]), (["c"], [[0.5, 0.6]])]
+        stored = self._run(pairs, total_chunks=3, resource_id="res-1", concurrency=1)
+
+        self.assertEqual(stored, 3)
+        self.assertEqual(self.async_client.upsert.await_count, 2)
+        points = [p for call in self.async_client.upsert.await_args_list for p in call.kwargs["points"]]
+        self.assertEqual([p.payload["text"] for p in points], ["a", "b", "c"])
+        self.assertEqual([p.payload["chunk_index"] for p in points], [0, 1, 2])
+        self.assertTrue(all(p.payload["resource_id"] == "res-1" for p in points))
+        self.assertTrue(all(p.payload["total_chunks"] == 3 for p in points))
+        self.async_client.close.assert_awaited_once()
+
+    def test_no_chunks(self):
+        """Nothing is upserted when there are no chunks"""
+        self.assertEqual(self._run([], total_chunks=0), 0)
+        self.async_client.upsert.assert_not_awaited()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -7,26 +7,30 @@ import unittest
 import sys
 import os
 
+import orjson
+
 # Add the project root to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from crm.models.rabbitmq_event_models import EmbeddingEvent
 
+# Read once; any of "0"/"false"/"" disables the pydantic-dependent tests
+PYDANTIC_AVAILABLE = os.getenv('PYDANTIC_AVAILABLE', '1').lower() not in ('0', 'false', '')
+
 
 class TestNewEmbeddingEvent(unittest.TestCase):
     """Test the new simplified EmbeddingEvent format"""
 
-    def setUp(self):
-        """Set up test fixtures"""
-        self.sample_texts = [
-            "This is a test chunk for embedding processing.",
-            "Another chunk to verify the processing pipeline.",
-            "Final chunk to complete the test."
-        ]
-        self.sample_task_id = "task-12345"
-        self.sample_resource_id = "resource-123"
-
-    @unittest.skipUnless(bool(os.getenv('PYDANTIC_AVAILABLE', True)), "EmbeddingEvent requires pydantic")
+    # Shared read-only fixtures; no test mutates them, so they are built once per class
+    sample_texts = [
+        "This is a test chunk for embedding processing.",
+        "Another chunk to verify the processing pipeline.",
+        "Final chunk to complete the test."
+    ]
+    sample_task_id = "task-12345"
+    sample_resource_id = "resource-123"
+
+    @unittest.skipUnless(PYDANTIC_AVAILABLE, "EmbeddingEvent requires pydantic")
     def test_new_embedding_event_creation(self):
         """Test creating new EmbeddingEvent with simplified format"""
         event = EmbeddingEvent(
@@ -46,7 +50,7 @@ class TestNewEmbeddingEvent(unittest.TestCase):
         self.assertEqual(event.user_id, "test-user")
         self.assertEqual(event.callback_url, "http://callback.example.com")
 
-    @unittest.skipUnless(bool(os.getenv('PYDANTIC_AVAILABLE', True)), "EmbeddingEvent requires pydantic")
+    @unittest.skipUnless(PYDANTIC_AVAILABLE, "EmbeddingEvent requires pydantic")
     def test_minimal_embedding_event(self):
         """Test creating EmbeddingEvent with minimal required fields"""
         event = EmbeddingEvent(
@@ -66,7 +70,7 @@ class TestNewEmbeddingEvent(unittest.TestCase):
         self.assertIsNone(event.user_id)
         self.assertIsNone(event.callback_url)
 
-    @unittest.skipUnless(bool(os.getenv('PYDANTIC_AVAILABLE', True)), "EmbeddingEvent requires pydantic")
+    @unittest.skipUnless(PYDANTIC_AVAILABLE, "EmbeddingEvent requires pydantic")
     def test_embedding_event_serialization(self):
         """Test EmbeddingEvent serialization for message queues"""
         event = EmbeddingEvent(
@@ -77,8 +81,8 @@ class TestNewEmbeddingEvent(unittest.TestCase):
             callback_url="http://callback.example.com"
         )
 
-        # Serialize to dict
-        event_dict = event.dict()
+        # Serialize straight to JSON bytes, as published to the queue, and read them back
+        event_dict = orjson.loads(event.model_dump_json())
 
         # Verify structure matches what the embedding service expects
         self.assertEqual(event_dict["event"], "create_embedding")
@@ -92,7 +96,7 @@ class TestNewEmbeddingEvent(unittest.TestCase):
         for field in required_fields:
             self.assertIn(field, event_dict)
 
-    @unittest.skipUnless(bool(os.getenv('PYDANTIC_AVAILABLE', True)), "EmbeddingEvent requires pydantic")
+    @unittest.skipUnless(PYDANTIC_AVAILABLE, "EmbeddingEvent requires pydantic")
     def test_different_event_types(self):
         """Test different embedding event types"""
         event_types = ["create_embedding", "batch_embedding"]
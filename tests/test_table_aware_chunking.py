@@ -3,6 +3,8 @@
 Test script for table-aware chunking functionality.
 """
 
+import sys
+
 from crm.utils.table_aware_splitter import TableAwareTextSplitter
 from crm.utils.token_text_splitter import TikTokenTextSplitter
 
@@ -49,59 +51,59 @@ def test_table_chunking():
     The quarterly breakdown shows increasing demand across all categories.
     """
 
-    print("=== TABLE-AWARE CHUNKING TEST ===\n")
+    # Collect every line and write once at the end instead of one print per line
+    out = []
+    out.append("=== TABLE-AWARE CHUNKING TEST ===\n")
 
     # Test with table-aware splitter
     table_splitter = TableAwareTextSplitter(max_tokens=200, overlap_tokens=50)
     table_chunks = table_splitter.split_text(sample_text)
+    table_flags = [table_splitter._is_table(chunk) for chunk in table_chunks]
 
-    print(f"Table-aware splitter created {len(table_chunks)} chunks:\n")
-
-    for i, chunk in enumerate(table_chunks):
-        token_count = table_splitter.count_tokens(chunk)
-        has_table = table_splitter._is_table(chunk)
-        print(f"Chunk {i+1} ({token_count} tokens, table: {has_table}):")
-        print(f"  Preview: {chunk[:150].strip()}...")
-        print()
+    out.append(f"Table-aware splitter created {len(table_chunks)} chunks:\n")
+    for i, (chunk, has_table) in enumerate(zip(table_chunks, table_flags)):
+        out.append(f"Chunk {i+1} ({table_splitter.count_tokens(chunk)} tokens, table: {has_table}):")
+        out.append(f"  Preview: {chunk[:150].strip()}...")
+        out.append("")
 
-    print("\n" + "="*50 + "\n")
+    out.append("\n" + "="*50 + "\n")
 
     # Compare with regular token splitter
     regular_splitter = TikTokenTextSplitter(max_tokens=200, overlap_tokens=50)
     regular_chunks = regular_splitter.split_text(sample_text)
+    regular_flags = [table_splitter._is_table(chunk) for chunk in regular_chunks]  # Use same detection logic
 
-    print(f"Regular token splitter created {len(regular_chunks)} chunks:\n")
+    out.append(f"Regular token splitter created {len(regular_chunks)} chunks:\n")
+    for i, (chunk, has_table) in enumerate(zip(regular_chunks, regular_flags)):
+        out.append(f"Chunk {i+1} ({regular_splitter.count_tokens(chunk)} tokens, table: {has_table}):")
+        out.append(f"  Preview: {chunk[:150].strip()}...")
+        out.append("")
 
-    for i, chunk in enumerate(regular_chunks):
-        token_count = regular_splitter.count_tokens(chunk)
-        has_table = table_splitter._is_table(chunk)  # Use same detection logic
-        print(f"Chunk {i+1} ({token_count} tokens, table: {has_table}):")
-        print(f"  Preview: {chunk[:150].strip()}...")
-        print()
+    out.append("\n" + "="*50)
+    out.append("COMPARISON SUMMARY:")
+    out.append(f"  Table-aware chunks: {len(table_chunks)}")
+    out.append(f"  Regular chunks: {len(regular_chunks)}")
+    out.append(f"  Tables preserved: {sum(table_flags)}")
+    out.append(f"  Tables split: {sum(regular_flags)}")
 
-    print("\n" + "="*50)
-    print("COMPARISON SUMMARY:")
-    print(f"  Table-aware chunks: {len(table_chunks)}")
-    print(f"  Regular chunks: {len(regular_chunks)}")
-    print(f"  Tables preserved: {sum(1 for c in table_chunks if table_splitter._is_table(c))}")
-    print(f"  Tables split: {sum(1 for c in regular_chunks if table_splitter._is_table(c))}")
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def test_large_table():
     """Test handling of large tables that exceed token limits."""
 
     # Create a very large table
-    large_table = "| Row | " + " | ".join([f"Col{i}" for i in range(20)]) + " |\n"
-    large_table += "|-----|" + "|".join(["------" for _ in range(20)]) + "|\n"
+    header = "| Row | " + " | ".join([f"Col{i}" for i in range(20)]) + " |\n"
+    header += "|-----|" + "|".join(["------" for _ in range(20)]) + "|\n"
 
-    for i in range(50):  # 50 rows
-        row_data = [f"Row{i}"] + [f"Data{i}_{j}" for j in range(20)]
-        large_table += "| " + " | ".join(row_data) + " |\n"
+    # Render every row from one template and join once instead of growing the string per row
+    row_template = "| Row{i} | " + " | ".join(f"Data{{i}}_{j}" for j in range(20)) + " |\n"
+    large_table = header + "".join(row_template.format(i=i) for i in range(50))  # 50 rows
 
 def test_token_counting_and_costs():
     """Test precise token counting and cost estimation features."""
 
-    print("\n=== TOKEN COUNTING & COST ESTIMATION TEST ===\n")
+    out = ["\n=== TOKEN COUNTING & COST ESTIMATION TEST ===\n"]
 
     # Test content with different text types
     simple_text = "This is a simple test sentence. It has multiple words for testing."
@@ -118,31 +120,31 @@ def test_token_counting_and_costs():
     simple_tokens = splitter.count_tokens(simple_text)
     table_tokens = splitter.count_tokens(table_content)
 
-    print(f"Simple text tokens: {simple_tokens}")
-    print(f"Table content tokens: {table_tokens}")
+    out.append(f"Simple text tokens: {simple_tokens}")
+    out.append(f"Table content tokens: {table_tokens}")
 
     # Test cost estimation
     simple_cost = splitter.estimate_cost(simple_text)
     table_cost = splitter.estimate_cost(table_content)
     combined_cost = splitter.estimate_cost(simple_text + table_content)
 
-    print(".6f")
-    print(".6f")
-    print(".6f")
+    out.append(f"Simple text cost: ${simple_cost:.6f}")
+    out.append(f"Table content cost: ${table_cost:.6f}")
+    out.append(f"Combined cost: ${combined_cost:.6f}")
 
     # Test with different models (different pricing)
     openai_embed_cost = splitter.estimate_cost(simple_text, cost_per_1000_tokens=0.0001)  # $0.10 per 1K
     openai_generation_cost = splitter.estimate_cost(simple_text, cost_per_1000_tokens=0.008)  # $8 per 1K
 
-    print(".6f")
-    print(".6f")
+    out.append(f"Embedding model cost: ${openai_embed_cost:.6f}")
+    out.append(f"Generation model cost: ${openai_generation_cost:.6f}")
 
-    return True
+    sys.stdout.write("\n".join(out) + "\n")
 
+    assert simple_tokens > 0 and table_tokens > 0
+    assert combined_cost >= max(simple_cost, table_cost)
+    assert openai_generation_cost > openai_embed_cost
 
-if __name__ == "__main__":
-    test_table_chunking()
-    test_token_counting_and_costs()
 
 if __name__ == "__main__":
     test_table_chunking()
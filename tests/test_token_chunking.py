@@ -35,7 +35,19 @@ def test_basic_token_splitting():
         print(f"\nChunk {i+1} ({token_count} tokens):")
         print(f"  '{chunk[:100]}...'")
     
-    return len(chunks) > 1
+    assert len(chunks) > 1, "Text should split into several chunks"
+
+def test_window_bounds_stride():
+    """Test that token windows advance by max_tokens - overlap_tokens and end at the text."""
+    print("\n=== Window Bounds Test ===")
+    
+    splitter = TikTokenTextSplitter(max_tokens=10, overlap_tokens=3)
+    bounds = splitter._window_bounds(25)
+    print(f"Windows over 25 tokens: {bounds}")
+    assert bounds == [(0, 10), (7, 17), (14, 24), (21, 25)]
+    
+    # An overlap as large as the window still advances one token at a time
+    assert TikTokenTextSplitter(max_tokens=4, overlap_tokens=4)._window_bounds(6) == [(0, 4), (1, 5), (2, 6)]
 
 def test_timestamp_aware_splitting():
     """Test timestamp-aware splitting for video transcripts."""
@@ -56,7 +68,7 @@ def test_timestamp_aware_splitting():
         print(f"\nChunk {i+1} ({token_count} tokens):")
         print(f"  '{chunk}'")
     
-    return len(chunks) > 0
+    assert len(chunks) > 0, "Transcript should produce chunks"
 
 def test_cost_estimation():
     """Test cost estimation functionality."""
@@ -73,7 +85,8 @@ def test_cost_estimation():
     print(f"Token count: {token_count}")
     print(f"Estimated embedding cost: ${estimated_cost:.6f}")
     
-    return token_count > 0
+    assert token_count > 0
+    assert estimated_cost > 0
 
 def test_performance_config():
     """Test integration with performance config."""
@@ -93,7 +106,7 @@ def test_performance_config():
     
     print(f"Created {len(chunks)} chunks using config values")
     
-    return len(chunks) > 0
+    assert len(chunks) > 0, "Config-sized splitter should produce chunks"
 
 def main():
     """Run all tests."""
@@ -102,6 +115,7 @@ def main():
     
     tests = [
         test_basic_token_splitting,
+        test_window_bounds_stride,
         test_timestamp_aware_splitting,
         test_cost_estimation,
         test_performance_config
@@ -110,9 +124,12 @@ def main():
     results = []
     for test in tests:
         try:
-            result = test()
-            results.append(result)
-            print(f"✓ {test.__name__}: {'PASSED' if result else 'FAILED'}")
+            test()
+            results.append(True)
+            print(f"✓ {test.__name__}: PASSED")
+        except AssertionError as e:
+            results.append(False)
+            print(f"✗ {test.__name__}: FAILED {e}")
         except Exception as e:
             results.append(False)
             print(f"✗ {test.__name__}: ERROR - {e}")